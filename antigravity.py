@@ -7,7 +7,7 @@ from urllib.parse import urlencode
 import streamlit as st
 import streamlit.components.v1 as components
 
-from gs_timetable import database, etl, service, supabase_db
+from gs_timetable import cohort, database, ingest, parse_cache, service, supabase_db
 from gs_timetable.constants import APP_TITLE, WEEKDAYS
 
 TARGET_GRADE = 2
@@ -21,19 +21,35 @@ st.set_page_config(page_title=APP_TITLE, page_icon="📚", layout="wide", initia
 
 
 @st.cache_resource
-def get_db():
-    conn = database.get_connection()
-    database.initialize_database(conn)
-    secrets = get_optional_secrets()
-    if supabase_db.is_enabled(secrets=secrets):
-        try:
-            supabase_db.sync_sqlite_from_supabase(conn, secrets=secrets)
+def get_db_pool() -> database.ConnectionPool:
+    pool = database.ConnectionPool()
+    with pool.writer() as conn:
+        database.initialize_database(conn)
+        secrets = get_optional_secrets()
+        if supabase_db.is_enabled(secrets=secrets):
+            try:
+                supabase_db.sync_sqlite_from_supabase(conn, secrets=secrets)
+                st.session_state.pop("_supabase_sync_error", None)
+            except Exception as exc:  # noqa: BLE001
+                st.session_state["_supabase_sync_error"] = str(exc)
+        else:
             st.session_state.pop("_supabase_sync_error", None)
-        except Exception as exc:  # noqa: BLE001
-            st.session_state["_supabase_sync_error"] = str(exc)
-    else:
-        st.session_state.pop("_supabase_sync_error", None)
-    return conn
+        # 프로세스 시작 시 한 번 다시 계산해 이전 버전 DB의 파생 테이블도 최신 형식으로 맞춘다.
+        cohort.rebuild_resolved_schedule(conn)
+    return pool
+
+
+@st.cache_resource
+def get_background_sync() -> supabase_db.BackgroundSync | None:
+    # 프로세스당 하나만 띄운다. 다른 인스턴스가 올린 변경분을 주기적으로 받아 학생별 시간표까지 다시 맞춘다.
+    secrets = get_optional_secrets()
+    if not supabase_db.is_enabled(secrets=secrets):
+        return None
+    return supabase_db.start_background_sync(
+        get_db_pool(),
+        secrets=secrets,
+        on_change=cohort.rebuild_resolved_schedule,
+    )
 
 
 def get_optional_secrets() -> dict[str, str]:
@@ -844,17 +860,15 @@ def render_navigation(conn) -> str:
 
 def _render_weekly_print_preview(
     student_info: dict,
-    weekly_schedule: dict[str, list[dict]],
+    weekly_grid: list[list[dict | None]],
     preview_nonce: int = 0,
 ) -> None:
     day_headers = "".join(f"<th>{escape(day)}요일</th>" for day in WEEKDAYS)
 
     body_rows: list[str] = []
-    for period in range(1, 8):
+    for period, period_cells in enumerate(weekly_grid, start=1):
         cells: list[str] = []
-        for day in WEEKDAYS:
-            rows = weekly_schedule.get(day, [])
-            row = next((item for item in rows if int(item.get("교시", 0)) == period), None)
+        for row in period_cells:
             if row is None:
                 subject = "-"
                 destination = "-"
@@ -1139,7 +1153,85 @@ def _render_weekly_print_preview(
     components.html(html, height=1280, scrolling=True)
 
 
-def render_admin(conn) -> None:
+def _render_room_occupancy(conn) -> None:
+    with st.expander("교실별 인원 현황", expanded=False):
+        day_col, period_col = st.columns(2)
+        with day_col:
+            weekday = st.selectbox("요일", WEEKDAYS, key="occupancy_weekday")
+        with period_col:
+            period = st.selectbox(
+                "교시", list(range(1, 8)), format_func=lambda value: f"{value}교시", key="occupancy_period"
+            )
+
+        headcounts = service.get_room_headcounts(conn, weekday, int(period))
+        if not headcounts:
+            st.caption("해당 시간에 계산된 이동 정보가 없습니다.")
+            return
+        st.dataframe(headcounts, use_container_width=True, hide_index=True)
+
+        room = st.selectbox(
+            "교실 선택",
+            [item["장소"] for item in headcounts],
+            key="occupancy_room",
+        )
+        students = service.list_students_in_room(conn, weekday, int(period), room)
+        st.caption(f"{weekday}요일 {period}교시 {room}: {len(students)}명")
+        st.dataframe(
+            [service.summarize_student(student) for student in students],
+            use_container_width=True,
+            hide_index=True,
+        )
+
+
+def _render_teacher_timetable(conn) -> None:
+    with st.expander("교사별 시간표 / 명단", expanded=False):
+        teachers = service.list_teachers(conn)
+        if not teachers:
+            st.caption("교사 정보가 있는 시간표가 없습니다.")
+            return
+        teacher_name = st.selectbox("교사", teachers, key="teacher_lookup_name")
+        slots = service.get_teacher_timetable(conn, teacher_name)
+        st.dataframe(slots, use_container_width=True, hide_index=True)
+        if not slots:
+            return
+
+        slot_keys = list(dict.fromkeys((item["요일"], item["교시"]) for item in slots))
+        weekday, period = st.selectbox(
+            "명단 볼 시간",
+            slot_keys,
+            format_func=lambda key: f"{key[0]}요일 {key[1]}교시",
+            key="teacher_lookup_slot",
+        )
+        students = service.get_teacher_roster(conn, teacher_name, weekday, int(period))
+        st.caption(f"{teacher_name} {weekday}요일 {period}교시: {len(students)}명")
+        st.dataframe(
+            [service.summarize_student(student) for student in students],
+            use_container_width=True,
+            hide_index=True,
+        )
+
+
+INGEST_STAGE_LABELS = {
+    "parse_student": "학생 파일 파싱",
+    "parse_timetable": "시간표 파일 파싱",
+    "parse_total": "파싱 전체",
+    "supabase_sync": "Supabase 동기화",
+    "db_publish": "로컬 DB 저장 및 학생별 시간표 계산",
+}
+
+
+def _format_sync_counts(label: str, counts: database.SyncCounts) -> str:
+    return f"{label}: 추가 {counts.inserted} / 변경 {counts.updated} / 삭제 {counts.deleted} / 유지 {counts.unchanged}"
+
+
+def _render_ingest_timings(timings: dict[str, float]) -> None:
+    with st.expander("단계별 처리 시간", expanded=False):
+        for stage, label in INGEST_STAGE_LABELS.items():
+            if stage in timings:
+                st.write(f"- {label}: {timings[stage] * 1000:.0f} ms")
+
+
+def render_admin(pool: database.ConnectionPool) -> None:
     if not st.session_state.get("admin_authenticated", False):
         st.markdown('<div class="gs-section-title">관리자 인증</div>', unsafe_allow_html=True)
         st.markdown('<div class="gs-section-sub">관리자 화면에 접근하려면 4자리 비밀번호가 필요합니다.</div>', unsafe_allow_html=True)
@@ -1173,6 +1265,7 @@ def render_admin(conn) -> None:
                 st.error("비밀번호가 일치하지 않습니다.")
         return
 
+    ingest.warm_up()
     st.markdown('<div class="gs-section-title">관리자 데이터 업로드</div>', unsafe_allow_html=True)
     st.markdown(
         '<div class="gs-section-sub">업로드 시 기존 SQLite 데이터를 덮어씁니다. (2학년 전용)</div>',
@@ -1201,6 +1294,11 @@ def render_admin(conn) -> None:
 
     st.info("현재 앱은 2학년 전용으로 설정되어 있습니다. 업로드 시 2학년 데이터만 반영됩니다.")
 
+    with pool.reader() as conn:
+        _render_room_occupancy(conn)
+        _render_teacher_timetable(conn)
+        has_previous = database.has_previous_snapshot(conn)
+
     secrets = get_optional_secrets()
     supabase_enabled = is_supabase_mode()
     config_error = supabase_db.get_configuration_error(secrets=secrets)
@@ -1209,20 +1307,56 @@ def render_admin(conn) -> None:
         sync_error = st.session_state.pop("_supabase_sync_error", None)
         if sync_error:
             st.warning(f"Supabase sync warning: {sync_error}")
+        background_sync = get_background_sync()
+        if background_sync is not None and background_sync.last_error:
+            st.warning(f"Supabase background sync warning: {background_sync.last_error}")
     else:
         st.caption("Local mode: data is saved only to local SQLite for PC/offline use.")
         if config_error:
             st.warning(f"Supabase configuration warning: {config_error}")
 
-    action_left, action_right = st.columns([2, 1])
+    action_left, action_middle, action_right = st.columns([2, 1, 1])
     update_clicked = action_left.button("DB 업데이트 실행", type="primary", use_container_width=True)
+    rollback_clicked = action_middle.button(
+        "직전 데이터로 되돌리기",
+        use_container_width=True,
+        disabled=not has_previous,
+    )
     clear_clicked = action_right.button("DB 초기화", use_container_width=True)
 
+    if rollback_clicked:
+        try:
+            # 업로드와 같은 순서로, 원격 반영이 성공한 뒤에만 로컬 테이블을 맞바꾼다.
+            # 원격 전송 중에는 쓰기 잠금을 잡지 않고, 교체 직전에 *_prev 가 그대로인지 확인한다.
+            with pool.reader() as reader:
+                previous_students = database.export_rows(reader, "student_master", database.PREV_SUFFIX)
+                previous_timetable = database.export_rows(reader, "timetable_pattern", database.PREV_SUFFIX)
+                previous_updated_at = database.get_meta(reader, database.PREVIOUS_UPDATED_AT_KEY) or ""
+            expected_fingerprint = database.compute_dataset_fingerprint(previous_students, previous_timetable)
+            if supabase_enabled:
+                supabase_db.replace_all_data(
+                    student_rows=previous_students,
+                    timetable_rows=previous_timetable,
+                    last_updated_at=previous_updated_at,
+                    secrets=secrets,
+                )
+            with pool.writer() as writer:
+                database.rollback_snapshot(writer, expected_fingerprint=expected_fingerprint)
+            st.success("직전 업로드 데이터로 되돌렸습니다.")
+            st.rerun()
+        except Exception as exc:  # noqa: BLE001
+            st.error(f"되돌리기 실패: {exc}")
+            st.exception(exc)
+        return
+
     if clear_clicked:
         try:
             if supabase_enabled:
                 supabase_db.clear_all_data(secrets=secrets)
-            database.clear_all_data(conn)
+            with pool.writer() as writer:
+                database.clear_all_data(writer)
+            # 파싱 캐시에도 학생 명단이 남아 있으므로 함께 지운다.
+            parse_cache.clear()
             st.success("데이터베이스를 초기화했습니다.")
             st.rerun()
         except Exception as exc:  # noqa: BLE001
@@ -1237,36 +1371,48 @@ def render_admin(conn) -> None:
         return
 
     try:
-        student_result = etl.parse_student_master_file(student_file, default_grade=TARGET_GRADE)
-        timetable_result = etl.parse_timetable_pattern_file(
-            timetable_file, target_grade=TARGET_GRADE
-        )
+        ingest_result = ingest.parse_uploads(student_file, timetable_file, grade=TARGET_GRADE)
+        student_result = ingest_result.student
+        timetable_result = ingest_result.timetable
+        timings = ingest_result.timings
 
         now_text = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
         if supabase_enabled:
-            supabase_db.replace_all_data(
-                student_rows=student_result.rows,
-                timetable_rows=timetable_result.rows,
-                last_updated_at=now_text,
-                secrets=secrets,
-            )
-
-        database.replace_student_master(conn, student_result.rows)
-        database.replace_timetable_patterns(conn, timetable_result.rows)
-        database.set_meta(conn, "last_updated_at", now_text)
-
-        stats = database.get_stats(conn)
+            with ingest.stage_timer(timings, "supabase_sync"):
+                supabase_db.replace_all_data(
+                    student_rows=student_result.rows,
+                    timetable_rows=timetable_result.rows,
+                    last_updated_at=now_text,
+                    secrets=secrets,
+                )
+
+        with ingest.stage_timer(timings, "db_publish"):
+            with pool.writer() as writer:
+                counts = ingest.publish_dataset(writer, student_result.rows, timetable_result.rows, now_text)
+
+        with pool.reader() as conn:
+            stats = database.get_stats(conn)
         st.success("데이터베이스가 성공적으로 업데이트되었습니다.")
         s1, s2 = st.columns(2)
         s1.metric("전체 학생 수", stats["student_count"])
         s2.metric("시간표 로드 개수", stats["timetable_count"])
+        st.caption(
+            " · ".join(
+                [
+                    _format_sync_counts("학생", counts["student_master"]),
+                    _format_sync_counts("시간표", counts["timetable_pattern"]),
+                    _format_sync_counts("학생별 시간표", counts["resolved_schedule"]),
+                ]
+            )
+        )
 
-        warnings = student_result.warnings + timetable_result.warnings
+        warnings = ingest_result.warnings
         if warnings:
             with st.expander(f"검증/제외 로그 ({len(warnings)}건)"):
                 for line in warnings:
                     st.write(f"- {line}")
+        _render_ingest_timings(timings)
     except Exception as exc:  # noqa: BLE001
         st.error(f"업로드 처리 실패: {exc}")
         st.exception(exc)
@@ -1430,7 +1576,7 @@ def render_student(conn) -> None:
         st.session_state.print_preview_nonce = int(st.session_state.get("print_preview_nonce", 0)) + 1
 
     st.markdown(f"### {weekday}요일 시간표")
-    schedule = service.get_schedule_for_student(conn, student, weekday)
+    schedule = service.get_resolved_schedule(conn, student, weekday)
     for row in schedule:
         period_text = f"{row['교시']}교시"
         subject_text = escape(str(row["과목명(교사)"]))
@@ -1458,24 +1604,29 @@ def render_student(conn) -> None:
         st.dataframe(schedule, use_container_width=True, hide_index=True)
 
     if st.session_state.get("print_preview_student_id") == str(info["학번"]):
-        weekly_schedule = {day: service.get_schedule_for_student(conn, student, day) for day in WEEKDAYS}
+        weekly_grid = service.get_weekly_schedule(conn, student)
         _render_weekly_print_preview(
             info,
-            weekly_schedule,
+            weekly_grid,
             preview_nonce=int(st.session_state.get("print_preview_nonce", 0)),
         )
 
 
 def main() -> None:
     render_header()
-    conn = get_db()
-    mode = render_navigation(conn)
+    pool = get_db_pool()
+    get_background_sync()
+    # 화면 조회는 필요한 구간에서만 읽기 전용 연결을 빌려 쓰고, 업로드 같은 쓰기만 pool.writer() 로 직렬화한다.
+    # 관리자 화면은 파싱/Supabase 전송처럼 오래 걸리는 작업 동안 연결을 붙잡지 않도록 구간별로 빌린다.
+    with pool.reader() as conn:
+        mode = render_navigation(conn)
     render_hero()
     focus_hero_on_mobile_first_load()
     if mode == MODE_ADMIN:
-        render_admin(conn)
+        render_admin(pool)
     else:
-        render_student(conn)
+        with pool.reader() as conn:
+            render_student(conn)
 
 
 if __name__ == "__main__":
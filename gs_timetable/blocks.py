@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Iterable
+
+from .constants import BLOCK_FIELD_MAP, DEFAULT_SUBJECT_BLOCK, SUBJECT_BLOCK_PREFIXES
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _compile_prefix_table(prefixes: Iterable[str]) -> re.Pattern[str]:
+    # 접두어가 서로 겹치면(예: "탐", "탐구1") 더 긴 쪽이 먼저 잡히도록 정렬한다.
+    ordered = sorted(prefixes, key=len, reverse=True)
+    return re.compile("|".join(re.escape(prefix) for prefix in ordered))
+
+
+_FIELD_PREFIX_RE = _compile_prefix_table(BLOCK_FIELD_MAP)
+_SUBJECT_PREFIX_RE = _compile_prefix_table(SUBJECT_BLOCK_PREFIXES)
+
+
+@lru_cache(maxsize=1024)
+def normalize_block(block_code: str | None) -> str:
+    return _WHITESPACE_RE.sub("", str(block_code or ""))
+
+
+@lru_cache(maxsize=1024)
+def block_to_student_field(block_code: str | None) -> str | None:
+    key = normalize_block(block_code)
+    if not key:
+        return None
+    match = _FIELD_PREFIX_RE.match(key)
+    return BLOCK_FIELD_MAP[match.group(0)] if match else None
+
+
+@lru_cache(maxsize=1024)
+def infer_block_code_from_subject(subject_name: str | None) -> str:
+    subject = normalize_block(subject_name)
+    if not subject:
+        return DEFAULT_SUBJECT_BLOCK
+    match = _SUBJECT_PREFIX_RE.match(subject)
+    return SUBJECT_BLOCK_PREFIXES[match.group(0)] if match else DEFAULT_SUBJECT_BLOCK
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import functools
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, TypeVar
+
+from .constants import DATA_VERSION_KEY
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+MAX_ENTRIES = 4096
+
+_lock = threading.Lock()
+_entries: OrderedDict[tuple[Any, ...], Any] = OrderedDict()
+_current_versions: dict[str, int] = {}
+
+
+def read_data_version(conn: sqlite3.Connection) -> tuple[str, int]:
+    row = conn.execute(
+        """
+        SELECT
+            (SELECT meta_value FROM app_meta WHERE meta_key = ?),
+            (SELECT file FROM pragma_database_list WHERE name = 'main')
+        """,
+        (DATA_VERSION_KEY,),
+    ).fetchone()
+    # 메모리 DB는 파일 경로가 없으므로 연결 단위로 구분한다.
+    db_key = row[1] or f"memory:{id(conn)}"
+    try:
+        return db_key, int(row[0] or 0)
+    except (TypeError, ValueError):
+        return db_key, 0
+
+
+def versioned(func: F) -> F:
+    # 첫 인자로 sqlite 연결을 받는 조회 함수를 데이터 버전 기준으로 캐시한다.
+    # 버전이 바뀌면 해당 DB의 캐시 항목이 한 번에 모두 버려진다.
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(conn: sqlite3.Connection, *args: Any, **kwargs: Any) -> Any:
+        db_key, version = read_data_version(conn)
+        key = (db_key, version, name, args, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return func(conn, *args, **kwargs)
+
+        with _lock:
+            if key in _entries:
+                _entries.move_to_end(key)
+                return _entries[key]
+
+        value = func(conn, *args, **kwargs)
+
+        with _lock:
+            if _current_versions.get(db_key) != version:
+                _current_versions[db_key] = version
+                for stale in [item for item in _entries if item[0] == db_key and item[1] != version]:
+                    del _entries[stale]
+            _entries[key] = value
+            while len(_entries) > MAX_ENTRIES:
+                _entries.popitem(last=False)
+        return value
+
+    return wrapper  # type: ignore[return-value]
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
+        _current_versions.clear()
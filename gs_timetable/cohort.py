@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import sqlite3
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from . import database
+from .constants import BLOCK_FIELD_MAP, SPECIAL_LOCATION_HOMEROOM, SPECIAL_LOCATION_MOVE, WEEKDAYS
+from .blocks import block_to_student_field, normalize_block
+from .service import extract_group_class_no_from_room, format_destination_display, room_from_destination
+
+PERIODS = list(range(1, 8))
+STUDENT_ROOM_FIELDS = sorted(set(BLOCK_FIELD_MAP.values()))
+RESOLVED_COLUMNS = [
+    "student_id",
+    "weekday",
+    "period",
+    "basis_class_no",
+    "block_code",
+    "subject_teacher",
+    "destination",
+    "room",
+    "teacher_name",
+]
+
+
+def _objects(values: Any) -> np.ndarray:
+    # pandas 버전에 따라 문자열 열이 str dtype(NaN)으로 바뀌므로 항상 object/None 으로 맞춘다.
+    array = np.asarray(values, dtype=object)
+    return np.where(pd.isna(array), None, array)
+
+
+def _map_unique(values: np.ndarray, func: Callable[[Any], Any]) -> np.ndarray:
+    # 블록 코드/교실 값은 종류가 적으므로 고유값에만 스칼라 규칙을 적용하고 코드 배열로 펼친다.
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    lookup = np.empty(len(uniques) + 1, dtype=object)
+    lookup[:-1] = [func(value) for value in uniques]
+    lookup[-1] = None
+    return lookup[codes]
+
+
+def _text_truthy(values: np.ndarray) -> np.ndarray:
+    return pd.notna(values) & (values != "")
+
+
+def _load_frame(conn: sqlite3.Connection, query: str) -> pd.DataFrame:
+    cursor = conn.execute(query)
+    columns = [item[0] for item in cursor.description]
+    return pd.DataFrame(cursor.fetchall(), columns=columns, dtype=object)
+
+
+def _prepare_students(students: pd.DataFrame) -> pd.DataFrame:
+    class_no = _objects(students["class_no"])
+    move_classroom = _objects(students["move_classroom"])
+    homeroom_location = _objects(students["homeroom_location"])
+
+    move_group = _map_unique(move_classroom, extract_group_class_no_from_room)
+    pattern_class = np.where(pd.notna(move_group), move_group, class_no)
+
+    has_class = pd.notna(class_no) & (class_no != 0)
+    class_text = np.array([f"{value}반" for value in class_no], dtype=object)
+    homeroom_text = np.where(
+        _text_truthy(homeroom_location),
+        homeroom_location,
+        np.where(has_class, class_text, "본반"),
+    )
+    move_text = np.where(_text_truthy(move_classroom), move_classroom, "이동반교실 미설정")
+
+    prepared = students.assign(
+        pattern_class_no=pattern_class,
+        homeroom_text=homeroom_text.astype(object),
+        move_text=move_text.astype(object),
+    )
+    prepared = prepared[pd.notna(pattern_class)].copy()
+    prepared["pattern_class_no"] = prepared["pattern_class_no"].astype("int64")
+    return prepared
+
+
+def resolve_schedule_frame(conn: sqlite3.Connection, source_suffix: str = "") -> pd.DataFrame:
+    # 전체 학생 x 요일 x 교시를 열 단위 연산으로 한 번에 계산한다.
+    # 결과는 service.get_schedule_for_student 와 같아야 하며, 기준 반이 없는 학생은 제외된다.
+    # source_suffix 를 주면 교체 대기 중인 스냅샷 테이블(*_next)을 원본으로 쓴다.
+    students = _load_frame(conn, f"SELECT * FROM student_master{source_suffix}")
+    patterns = _load_frame(
+        conn,
+        f"""
+        SELECT class_no, weekday, period, block_code, subject_teacher, teacher_name, exception_location
+        FROM timetable_pattern{source_suffix}
+        """,
+    )
+    if students.empty:
+        return pd.DataFrame(columns=RESOLVED_COLUMNS)
+
+    students = _prepare_students(students)
+    slots = pd.DataFrame(
+        [(weekday, period) for weekday in WEEKDAYS for period in PERIODS],
+        columns=["weekday", "period"],
+    )
+    grid = students.merge(slots, how="cross")
+
+    patterns = patterns.astype({"class_no": "int64", "period": "int64"})
+    base = patterns.rename(
+        columns={
+            "class_no": "pattern_class_no",
+            "block_code": "base_block_code",
+            "subject_teacher": "base_subject_teacher",
+            "teacher_name": "base_teacher_name",
+            "exception_location": "base_exception_location",
+        }
+    )
+    base["has_base"] = True
+    grid = grid.merge(base, on=["pattern_class_no", "weekday", "period"], how="left")
+
+    has_base = grid["has_base"].eq(True).to_numpy()
+    base_class = grid["pattern_class_no"].to_numpy(dtype="int64")
+    homeroom_text = _objects(grid["homeroom_text"])
+    move_text = _objects(grid["move_text"])
+    block_key = _map_unique(_objects(grid["base_block_code"]), normalize_block)
+    field = _map_unique(block_key, block_to_student_field)
+
+    exception = _objects(grid["base_exception_location"])
+    has_exception = _text_truthy(exception)
+    exception_text = np.where(has_exception, exception, "")
+    exception_resolved = np.select(
+        [
+            np.isin(exception_text, [SPECIAL_LOCATION_HOMEROOM, "본반"]),
+            np.isin(exception_text, [SPECIAL_LOCATION_MOVE, "본인선택반", "본인 선택반"]),
+        ],
+        [homeroom_text, move_text],
+        default=exception_text,
+    )
+
+    # 블록 코드 -> 학생 교실 컬럼을 벡터 선택으로 매핑한다.
+    field_value = np.select(
+        [field == name for name in STUDENT_ROOM_FIELDS],
+        [_objects(grid[name]) for name in STUDENT_ROOM_FIELDS],
+        default=None,
+    )
+    raw_destination = np.select(
+        [
+            ~has_base,
+            block_key == "진로2",
+            block_key == "공강",
+            has_exception,
+            _text_truthy(field_value),
+        ],
+        [
+            "시간표 없음",
+            move_text,
+            homeroom_text,
+            exception_resolved,
+            field_value,
+        ],
+        default=homeroom_text,
+    )
+    destination = np.where(
+        has_base & (block_key == "동아리"),
+        "본인선택반",
+        _map_unique(raw_destination, format_destination_display),
+    )
+
+    room = np.where(has_base, _map_unique(raw_destination, room_from_destination), None)
+
+    follow = has_base & (
+        (block_key == "공강") | pd.notna(field) | (exception_text == SPECIAL_LOCATION_MOVE)
+    )
+    target = _map_unique(raw_destination, extract_group_class_no_from_room)
+    target_valid = follow & pd.notna(target)
+    target_class = np.where(target_valid, target, -1).astype("int64")
+    target_class = np.where(target_valid & (target_class != base_class), target_class, -1)
+    grid["target_class_no"] = target_class
+
+    override = patterns.rename(
+        columns={
+            "class_no": "target_class_no",
+            "block_code": "override_block_code",
+            "subject_teacher": "override_subject_teacher",
+            "teacher_name": "override_teacher_name",
+        }
+    ).drop(columns=["exception_location"])
+    grid = grid.merge(override, on=["target_class_no", "weekday", "period"], how="left")
+    use_override = pd.notna(_objects(grid["override_block_code"]))
+
+    # service 와 동일하게 `effective_class_no or pattern_class_no` 규칙을 따른다.
+    effective_class = np.where(use_override, target_class, np.where(has_base, base_class, 0))
+    basis_class = np.where(effective_class != 0, effective_class, base_class)
+    block_code = np.where(
+        use_override,
+        _objects(grid["override_block_code"]),
+        np.where(has_base, _objects(grid["base_block_code"]), None),
+    )
+    teacher_name = np.where(
+        use_override,
+        _objects(grid["override_teacher_name"]),
+        np.where(has_base, _objects(grid["base_teacher_name"]), None),
+    )
+    subject_teacher = np.where(
+        use_override,
+        _objects(grid["override_subject_teacher"]),
+        np.where(has_base, _objects(grid["base_subject_teacher"]), "시간표 없음"),
+    )
+
+    return pd.DataFrame(
+        {
+            "student_id": _objects(grid["student_id"]),
+            "weekday": _objects(grid["weekday"]),
+            "period": grid["period"].to_numpy(dtype="int64"),
+            "basis_class_no": basis_class.astype("int64"),
+            "block_code": _objects(block_code),
+            "subject_teacher": _objects(subject_teacher),
+            "destination": _objects(destination),
+            "room": _objects(room),
+            "teacher_name": _objects(teacher_name),
+        },
+        columns=RESOLVED_COLUMNS,
+    )
+
+
+def build_resolved_schedule_rows(conn: sqlite3.Connection, source_suffix: str = "") -> list[dict[str, Any]]:
+    frame = resolve_schedule_frame(conn, source_suffix=source_suffix)
+    columns = [
+        _objects(frame[name]) if name not in ("period", "basis_class_no") else frame[name].tolist()
+        for name in RESOLVED_COLUMNS
+    ]
+    return [dict(zip(RESOLVED_COLUMNS, values)) for values in zip(*columns)]
+
+
+def rebuild_resolved_schedule(conn: sqlite3.Connection) -> database.SyncCounts:
+    # 업로드/동기화 직후 한 번만 전체 학생의 시간표를 계산해 둔다. 바뀐 학생의 행만 다시 쓴다.
+    return database.sync_resolved_schedule(conn, build_resolved_schedule_rows(conn))
@@ -15,6 +15,9 @@ APP_TITLE = "GS-Timetable"
 BASE_DIR = Path(__file__).resolve().parent.parent
 RUNTIME_DIR = _get_runtime_dir()
 DB_PATH = RUNTIME_DIR / "antigravity.db"
+# 업로드 파싱 결과 캐시. 크기 합계가 상한을 넘으면 오래 안 쓴 항목부터 지운다.
+PARSE_CACHE_DIR = RUNTIME_DIR / ".parse_cache"
+PARSE_CACHE_MAX_BYTES = 64 * 1024 * 1024
 
 WEEKDAYS = ["월", "화", "수", "목", "금"]
 PY_WEEKDAY_TO_KO = {0: "월", 1: "화", 2: "수", 3: "목", 4: "금", 5: "토", 6: "일"}
@@ -42,3 +45,30 @@ BLOCK_FIELD_MAP = {
     "이동반": "move_classroom",
     "선택반": "move_classroom",
 }
+
+# 섹션형 시간표 CSV의 과목명 접두어 -> 수업블록. 새 블록은 여기 항목만 추가하면 된다.
+SUBJECT_BLOCK_PREFIXES = {
+    "기1": "기초1",
+    "기2": "기초2",
+    "탐1": "탐1",
+    "탐2": "탐2",
+    "탐3": "탐3",
+    "정보": "교양",
+    "철학": "교양",
+    **{keyword: keyword for keyword in UPLOAD_EXCEPTION_RULES},
+}
+DEFAULT_SUBJECT_BLOCK = "이동반"
+
+# app_meta 에 저장되는 데이터 버전. 데이터가 바뀔 때마다 1씩 증가하며 조회 캐시 무효화 기준이 된다.
+DATA_VERSION_KEY = "data_version"
+# 쓰기 경로가 함께 갱신하는 통계 메타. 화면의 건수 표시는 COUNT(*) 대신 이 값을 읽는다.
+STUDENT_COUNT_KEY = "student_count"
+TIMETABLE_COUNT_KEY = "timetable_count"
+LAST_UPDATED_AT_KEY = "last_updated_at"
+# 업로드된 학생/시간표 데이터의 내용 해시와 건수. 원격과 같으면 시작 시 전체 내려받기를 건너뛴다.
+DATASET_FINGERPRINT_KEY = "dataset_fingerprint"
+# Supabase 증분 동기화 기준점. 테이블별로 이미 받은 원격 updated_at 의 최댓값이며 이 DB에서만 관리한다.
+SYNC_WATERMARK_KEYS = {
+    "student_master": "student_master_synced_through",
+    "timetable_pattern": "timetable_pattern_synced_through",
+}
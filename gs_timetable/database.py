@@ -1,10 +1,94 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import queue
+import re
 import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, Mapping
+from typing import Iterable, Iterator, Mapping, Sequence
 
-from .constants import DB_PATH
+from .constants import (
+    DATA_VERSION_KEY,
+    DB_PATH,
+    LAST_UPDATED_AT_KEY,
+    STUDENT_COUNT_KEY,
+    SYNC_WATERMARK_KEYS,
+    TIMETABLE_COUNT_KEY,
+)
+
+
+STUDENT_KEY_COLUMNS = ("student_id",)
+STUDENT_VALUE_COLUMNS = (
+    "student_name",
+    "class_no",
+    "student_no",
+    "homeroom_location",
+    "move_classroom",
+    "basic1_classroom",
+    "basic2_classroom",
+    "inquiry1_classroom",
+    "inquiry2_classroom",
+    "inquiry3_classroom",
+    "liberal_classroom",
+)
+TIMETABLE_KEY_COLUMNS = ("class_no", "weekday", "period")
+TIMETABLE_VALUE_COLUMNS = (
+    "block_code",
+    "subject_name",
+    "teacher_name",
+    "subject_teacher",
+    "exception_location",
+)
+RESOLVED_KEY_COLUMNS = ("student_id", "weekday", "period")
+RESOLVED_VALUE_COLUMNS = (
+    "basis_class_no",
+    "block_code",
+    "subject_teacher",
+    "destination",
+    "room",
+    "teacher_name",
+)
+SNAPSHOT_COLUMNS = {
+    "student_master": (*STUDENT_KEY_COLUMNS, *STUDENT_VALUE_COLUMNS),
+    "timetable_pattern": (*TIMETABLE_KEY_COLUMNS, *TIMETABLE_VALUE_COLUMNS),
+    "resolved_schedule": (*RESOLVED_KEY_COLUMNS, *RESOLVED_VALUE_COLUMNS),
+}
+SNAPSHOT_KEYS = {
+    "student_master": STUDENT_KEY_COLUMNS,
+    "timetable_pattern": TIMETABLE_KEY_COLUMNS,
+    "resolved_schedule": RESOLVED_KEY_COLUMNS,
+}
+DEFAULT_MAX_READERS = 8
+READER_ACQUIRE_TIMEOUT_SECONDS = 10.0
+BUSY_TIMEOUT_MS = 5000
+NEXT_SUFFIX = "_next"
+PREV_SUFFIX = "_prev"
+SWAP_SUFFIX = "_swap"
+PREVIOUS_UPDATED_AT_KEY = "previous_updated_at"
+# 이 DB에서만 관리하는 메타 값. 원격(Supabase) 메타로 덮어쓰거나 지우지 않는다.
+LOCAL_META_KEYS = (
+    DATA_VERSION_KEY,
+    STUDENT_COUNT_KEY,
+    TIMETABLE_COUNT_KEY,
+    PREVIOUS_UPDATED_AT_KEY,
+    *SYNC_WATERMARK_KEYS.values(),
+)
+
+
+@dataclass
+class SyncCounts:
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.inserted or self.updated or self.deleted)
 
 
 def get_connection(db_path: str | Path = DB_PATH) -> sqlite3.Connection:
@@ -13,6 +97,75 @@ def get_connection(db_path: str | Path = DB_PATH) -> sqlite3.Connection:
     return conn
 
 
+class ConnectionPool:
+    # 읽기 연결은 여러 개를 빌려 쓰고(query_only), 쓰기는 하나의 연결을 잠금으로 직렬화한다.
+    # WAL 모드라 쓰는 동안에도 읽기 연결은 마지막으로 커밋된 데이터를 막힘 없이 읽는다.
+    def __init__(self, db_path: str | Path = DB_PATH, max_readers: int = DEFAULT_MAX_READERS) -> None:
+        self.db_path = str(db_path)
+        # 메모리 DB는 연결마다 따로 생기므로 하나의 연결을 모두가 함께 쓴다.
+        self.shared = self.db_path == ":memory:"
+        self._write_lock = threading.RLock()
+        self._writer: sqlite3.Connection | None = None
+        self._reader_slots = threading.BoundedSemaphore(max_readers)
+        self._idle_readers: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._opened_lock = threading.Lock()
+        self._opened: list[sqlite3.Connection] = []
+
+    def _open(self, *, read_only: bool) -> sqlite3.Connection:
+        conn = get_connection(self.db_path)
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        if read_only:
+            conn.execute("PRAGMA query_only = ON")
+        else:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+        with self._opened_lock:
+            self._opened.append(conn)
+        return conn
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._open(read_only=False)
+            try:
+                yield self._writer
+            finally:
+                # 중간에 끊긴 트랜잭션이 다음 쓰기에 섞이지 않게 정리한다.
+                if self._writer.in_transaction:
+                    self._writer.rollback()
+
+    @contextmanager
+    def reader(self, timeout: float = READER_ACQUIRE_TIMEOUT_SECONDS) -> Iterator[sqlite3.Connection]:
+        if self.shared:
+            with self.writer() as conn:
+                yield conn
+            return
+
+        # 연결을 오래 붙잡는 호출이 있어도 나머지 세션이 끝없이 기다리지 않게 한다.
+        if not self._reader_slots.acquire(timeout=timeout):
+            raise RuntimeError("DB 읽기 연결이 모두 사용 중입니다. 잠시 후 다시 시도해 주세요.")
+        try:
+            try:
+                conn = self._idle_readers.get_nowait()
+            except queue.Empty:
+                conn = self._open(read_only=True)
+            try:
+                yield conn
+            finally:
+                self._idle_readers.put(conn)
+        finally:
+            self._reader_slots.release()
+
+    def close(self) -> None:
+        with self._write_lock, self._opened_lock:
+            for conn in self._opened:
+                conn.close()
+            self._opened.clear()
+            self._writer = None
+            self._idle_readers = queue.LifoQueue()
+
+
 def initialize_database(conn: sqlite3.Connection) -> None:
     conn.executescript(
         """
@@ -53,83 +206,481 @@ def initialize_database(conn: sqlite3.Connection) -> None:
         CREATE INDEX IF NOT EXISTS idx_timetable_pattern_lookup
             ON timetable_pattern(class_no, weekday, period);
 
+        CREATE TABLE IF NOT EXISTS resolved_schedule (
+            student_id TEXT NOT NULL,
+            weekday TEXT NOT NULL,
+            period INTEGER NOT NULL,
+            basis_class_no INTEGER,
+            block_code TEXT,
+            subject_teacher TEXT NOT NULL,
+            destination TEXT NOT NULL,
+            room TEXT,
+            teacher_name TEXT,
+            PRIMARY KEY (student_id, weekday, period)
+        );
+
         CREATE TABLE IF NOT EXISTS app_meta (
             meta_key TEXT PRIMARY KEY,
             meta_value TEXT NOT NULL
         );
         """
     )
+    # 이전 버전에서 만든 DB에는 새 컬럼이 없으므로 보강한다. (파생 데이터라 재계산 시 채워진다)
+    _add_missing_columns(conn, "resolved_schedule", {"room": "TEXT", "teacher_name": "TEXT"})
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_resolved_schedule_room ON resolved_schedule(weekday, period, room)"
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_resolved_schedule_teacher
+            ON resolved_schedule(teacher_name, weekday, period)
+        """
+    )
+    # 건수 메타가 없던 이전 DB도 시작 시 한 번 채워 둔다.
+    _store_stats(conn)
     conn.commit()
 
 
-def replace_student_master(conn: sqlite3.Connection, rows: Iterable[Mapping[str, object]]) -> int:
-    rows = list(rows)
+def _add_missing_columns(conn: sqlite3.Connection, table_name: str, columns: Mapping[str, str]) -> None:
+    existing = _table_columns(conn, table_name)
+    for column, declaration in columns.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {column} {declaration}")
+
+
+def _sync_table(
+    conn: sqlite3.Connection,
+    table_name: str,
+    key_columns: Sequence[str],
+    value_columns: Sequence[str],
+    rows: Iterable[Mapping[str, object]],
+    *,
+    where: str = "",
+    where_params: Sequence[object] = (),
+) -> SyncCounts:
+    # 기본 키 기준으로 현재 행과 비교해 바뀐 행만 INSERT/UPDATE/DELETE 한다.
+    columns = [*key_columns, *value_columns]
+    key_size = len(key_columns)
+    incoming: dict[tuple[object, ...], tuple[object, ...]] = {}
+    for row in rows:
+        values = tuple(row.get(column) for column in columns)
+        incoming[values[:key_size]] = values[key_size:]
+
+    key_clause = " AND ".join(f"{column} = ?" for column in key_columns)
+    set_clause = ", ".join(f"{column} = ?" for column in value_columns)
+
     with conn:
-        conn.execute("DELETE FROM student_master")
-        conn.executemany(
-            """
-            INSERT INTO student_master (
-                student_id, student_name, class_no, student_no, homeroom_location,
-                move_classroom, basic1_classroom, basic2_classroom,
-                inquiry1_classroom, inquiry2_classroom, inquiry3_classroom, liberal_classroom
-            ) VALUES (
-                :student_id, :student_name, :class_no, :student_no, :homeroom_location,
-                :move_classroom, :basic1_classroom, :basic2_classroom,
-                :inquiry1_classroom, :inquiry2_classroom, :inquiry3_classroom, :liberal_classroom
-            )
-            """,
-            rows,
+        existing: dict[tuple[object, ...], tuple[object, ...]] = {}
+        for row in conn.execute(f"SELECT {', '.join(columns)} FROM {table_name}{where}", tuple(where_params)):
+            values = tuple(row)
+            existing[values[:key_size]] = values[key_size:]
+
+        inserts = [key + values for key, values in incoming.items() if key not in existing]
+        updates = [
+            values + key for key, values in incoming.items() if key in existing and existing[key] != values
+        ]
+        deletes = [key for key in existing if key not in incoming]
+        counts = SyncCounts(
+            inserted=len(inserts),
+            updated=len(updates),
+            deleted=len(deletes),
+            unchanged=len(incoming) - len(inserts) - len(updates),
         )
-    return len(rows)
+        if counts.changed:
+            conn.executemany(f"DELETE FROM {table_name} WHERE {key_clause}", deletes)
+            conn.executemany(f"UPDATE {table_name} SET {set_clause} WHERE {key_clause}", updates)
+            conn.executemany(
+                f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+                inserts,
+            )
+            # 바뀐 것이 없으면 데이터 버전도 그대로 두어 조회 캐시를 유지한다.
+            _bump_data_version(conn)
+    return counts
+
+
+def sync_resolved_schedule(conn: sqlite3.Connection, rows: Iterable[Mapping[str, object]]) -> SyncCounts:
+    return _sync_table(conn, "resolved_schedule", RESOLVED_KEY_COLUMNS, RESOLVED_VALUE_COLUMNS, rows)
 
 
-def replace_timetable_patterns(conn: sqlite3.Connection, rows: Iterable[Mapping[str, object]]) -> int:
-    rows = list(rows)
+def upsert_table_rows(conn: sqlite3.Connection, table_name: str, rows: Iterable[Mapping[str, object]]) -> SyncCounts:
+    # 일부 행만 받은 경우(증분 동기화)에 쓴다. 받은 행 중 새로 생기거나 값이 바뀐 행만 반영하고 나머지 행은 지우지 않는다.
+    columns = SNAPSHOT_COLUMNS[table_name]
+    keys = SNAPSHOT_KEYS[table_name]
+    values = [column for column in columns if column not in keys]
+    key_size = len(keys)
+    incoming: dict[tuple[object, ...], tuple[object, ...]] = {}
+    for row in rows:
+        row_values = tuple(row.get(column) for column in columns)
+        incoming[row_values[:key_size]] = row_values
+
+    assignments = ", ".join(f"{column} = excluded.{column}" for column in values)
+    if "updated_at" in _table_columns(conn, table_name):
+        assignments += ", updated_at = CURRENT_TIMESTAMP"
+
+    with conn:
+        # _sync_table 과 같이 현재 행을 한 번에 읽어 비교한다.
+        existing: dict[tuple[object, ...], tuple[object, ...]] = {}
+        for row in conn.execute(f"SELECT {', '.join(columns)} FROM {table_name}"):
+            current = tuple(row)
+            existing[current[:key_size]] = current[key_size:]
+
+        inserted = sum(1 for key in incoming if key not in existing)
+        changed = [
+            row_values for key, row_values in incoming.items() if existing.get(key) != row_values[key_size:]
+        ]
+        if changed:
+            conn.executemany(
+                f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)}) "
+                f"ON CONFLICT({', '.join(keys)}) DO UPDATE SET {assignments}",
+                changed,
+            )
+            _bump_data_version(conn)
+    return SyncCounts(
+        inserted=inserted,
+        updated=len(changed) - inserted,
+        deleted=0,
+        unchanged=len(incoming) - len(changed),
+    )
+
+
+def sync_meta(conn: sqlite3.Connection, values: Mapping[str, str]) -> SyncCounts:
+    return _sync_table(
+        conn,
+        "app_meta",
+        ("meta_key",),
+        ("meta_value",),
+        [{"meta_key": key, "meta_value": value} for key, value in values.items() if key not in LOCAL_META_KEYS],
+        where=f" WHERE meta_key NOT IN ({', '.join('?' for _ in LOCAL_META_KEYS)})",
+        where_params=LOCAL_META_KEYS,
+    )
+
+
+def _begin(conn: sqlite3.Connection) -> None:
+    # sqlite3 모듈은 DDL 앞에서 트랜잭션을 자동으로 열지 않으므로 테이블 교체는 직접 연다.
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+
+
+def _table_exists(conn: sqlite3.Connection, table_name: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+    ).fetchone()
+    return row is not None
+
+
+def begin_snapshot(conn: sqlite3.Connection, tables: Iterable[str] = tuple(SNAPSHOT_COLUMNS)) -> None:
+    # 새 데이터는 운영 테이블과 같은 구조의 *_next 테이블에 먼저 쓴다. 읽는 쪽은 교체 전까지 기존 테이블만 본다.
+    with conn:
+        _begin(conn)
+        for table_name in tables:
+            shadow = f"{table_name}{NEXT_SUFFIX}"
+            ddl = conn.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table_name,)
+            ).fetchone()[0]
+            conn.execute(f"DROP TABLE IF EXISTS {shadow}")
+            conn.execute(re.sub(rf"^CREATE TABLE\s+\"?{table_name}\"?", f"CREATE TABLE {shadow}", ddl, count=1))
+
+
+def write_snapshot_rows(
+    conn: sqlite3.Connection,
+    table_name: str,
+    rows: Iterable[Mapping[str, object]],
+    *,
+    replace: bool = False,
+) -> int:
+    columns = SNAPSHOT_COLUMNS[table_name]
+    values = [tuple(row.get(column) for column in columns) for row in rows]
+    verb = "INSERT OR REPLACE" if replace else "INSERT"
     with conn:
-        conn.execute("DELETE FROM timetable_pattern")
         conn.executemany(
+            f"{verb} INTO {table_name}{NEXT_SUFFIX} ({', '.join(columns)}) "
+            f"VALUES ({', '.join('?' for _ in columns)})",
+            values,
+        )
+    return len(values)
+
+
+def snapshot_diff(conn: sqlite3.Connection, table_name: str) -> SyncCounts:
+    shadow = f"{table_name}{NEXT_SUFFIX}"
+    keys = SNAPSHOT_KEYS[table_name]
+    values = [column for column in SNAPSHOT_COLUMNS[table_name] if column not in keys]
+    key_match = " AND ".join(f"live.{column} = next.{column}" for column in keys)
+    value_diff = " OR ".join(f"live.{column} IS NOT next.{column}" for column in values)
+    inserted, updated, deleted, total = conn.execute(
+        f"""
+        SELECT
+            (SELECT COUNT(*) FROM {shadow} AS next
+             WHERE NOT EXISTS (SELECT 1 FROM {table_name} AS live WHERE {key_match})),
+            (SELECT COUNT(*) FROM {shadow} AS next JOIN {table_name} AS live ON {key_match}
+             WHERE {value_diff}),
+            (SELECT COUNT(*) FROM {table_name} AS live
+             WHERE NOT EXISTS (SELECT 1 FROM {shadow} AS next WHERE {key_match})),
+            (SELECT COUNT(*) FROM {shadow})
+        """
+    ).fetchone()
+    return SyncCounts(inserted=inserted, updated=updated, deleted=deleted, unchanged=total - inserted - updated)
+
+
+def merge_snapshot_table(conn: sqlite3.Connection, table_name: str) -> SyncCounts:
+    # *_next 에 받아 둔 행을 운영 테이블에 기본 키 기준 차이만 반영한다. (교체 대신 병합)
+    shadow = f"{table_name}{NEXT_SUFFIX}"
+    columns = SNAPSHOT_COLUMNS[table_name]
+    keys = SNAPSHOT_KEYS[table_name]
+    values = [column for column in columns if column not in keys]
+    key_match = " AND ".join(f"{table_name}.{column} = next.{column}" for column in keys)
+    assignments = ", ".join(f"{column} = excluded.{column}" for column in values)
+    changed = " OR ".join(f"{table_name}.{column} IS NOT excluded.{column}" for column in values)
+    if "updated_at" in _table_columns(conn, table_name):
+        assignments += ", updated_at = CURRENT_TIMESTAMP"
+
+    with conn:
+        counts = snapshot_diff(conn, table_name)
+        if not counts.changed:
+            return counts
+        conn.execute(
+            f"DELETE FROM {table_name} WHERE NOT EXISTS (SELECT 1 FROM {shadow} AS next WHERE {key_match})"
+        )
+        conn.execute(
+            f"""
+            INSERT INTO {table_name} ({', '.join(columns)})
+            SELECT {', '.join(columns)} FROM {shadow} WHERE true
+            ON CONFLICT({', '.join(keys)}) DO UPDATE SET {assignments} WHERE {changed}
             """
-            INSERT INTO timetable_pattern (
-                class_no, weekday, period, block_code,
-                subject_name, teacher_name, subject_teacher, exception_location
-            ) VALUES (
-                :class_no, :weekday, :period, :block_code,
-                :subject_name, :teacher_name, :subject_teacher, :exception_location
-            )
-            """,
-            rows,
         )
-    return len(rows)
+        _bump_data_version(conn)
+    return counts
+
+
+def _table_columns(conn: sqlite3.Connection, table_name: str) -> set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table_name})").fetchall()}
+
+
+def _swap_tables(conn: sqlite3.Connection, table_name: str, incoming: str, outgoing: str) -> None:
+    # 인덱스는 이름을 유지한 채 테이블을 따라가므로, 운영 테이블 이름을 받는 새 테이블에 다시 만든다.
+    indexes = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table_name,),
+    ).fetchall()
+    conn.execute(f"DROP TABLE IF EXISTS {outgoing}")
+    conn.execute(f"ALTER TABLE {table_name} RENAME TO {outgoing}")
+    conn.execute(f"ALTER TABLE {incoming} RENAME TO {table_name}")
+    for name, sql in indexes:
+        conn.execute(f"DROP INDEX IF EXISTS {name}")
+        conn.execute(sql)
+
+
+def _carry_unchanged_timestamps(conn: sqlite3.Connection, table_name: str) -> None:
+    # 값이 그대로인 행은 운영 테이블의 updated_at 을 물려받아, 교체 후에도 실제로 바뀐 행만 새 시각을 갖게 한다.
+    shadow = f"{table_name}{NEXT_SUFFIX}"
+    keys = SNAPSHOT_KEYS[table_name]
+    values = [column for column in SNAPSHOT_COLUMNS[table_name] if column not in keys]
+    same_row = " AND ".join(
+        [
+            *(f"live.{column} = {shadow}.{column}" for column in keys),
+            *(f"live.{column} IS {shadow}.{column}" for column in values),
+        ]
+    )
+    conn.execute(
+        f"""
+        UPDATE {shadow}
+        SET updated_at = (SELECT live.updated_at FROM {table_name} AS live WHERE {same_row})
+        WHERE EXISTS (SELECT 1 FROM {table_name} AS live WHERE {same_row})
+        """
+    )
 
 
-def set_meta(conn: sqlite3.Connection, key: str, value: str) -> None:
+def swap_snapshot(conn: sqlite3.Connection, meta: Mapping[str, str] | None = None) -> None:
+    # 한 트랜잭션에서 *_next -> 운영, 운영 -> *_prev 로 이름만 바꾼다. 직전 데이터는 되돌리기용으로 남는다.
     with conn:
+        _begin(conn)
+        for table_name in SNAPSHOT_COLUMNS:
+            if "updated_at" in _table_columns(conn, table_name):
+                _carry_unchanged_timestamps(conn, table_name)
+            _swap_tables(conn, table_name, f"{table_name}{NEXT_SUFFIX}", f"{table_name}{PREV_SUFFIX}")
         conn.execute(
             """
             INSERT INTO app_meta(meta_key, meta_value)
-            VALUES (?, ?)
+            SELECT ?, meta_value FROM app_meta WHERE meta_key = ?
             ON CONFLICT(meta_key) DO UPDATE SET meta_value = excluded.meta_value
             """,
-            (key, value),
+            (PREVIOUS_UPDATED_AT_KEY, LAST_UPDATED_AT_KEY),
+        )
+        for key, value in (meta or {}).items():
+            _upsert_meta(conn, key, value)
+        _bump_data_version(conn)
+
+
+def discard_snapshot(conn: sqlite3.Connection, tables: Iterable[str] = tuple(SNAPSHOT_COLUMNS)) -> None:
+    with conn:
+        _begin(conn)
+        for table_name in tables:
+            conn.execute(f"DROP TABLE IF EXISTS {table_name}{NEXT_SUFFIX}")
+
+
+def compute_dataset_fingerprint(
+    student_rows: Iterable[Mapping[str, object]],
+    timetable_rows: Iterable[Mapping[str, object]],
+) -> str:
+    # 행 순서와 상관없이 같은 내용이면 같은 값이 되도록 행을 직렬화해 정렬한 뒤 해시한다. 형식: <sha256>:<학생 수>:<시간표 수>
+    digest = hashlib.sha256()
+    counts: list[int] = []
+    for table_name, rows in (("student_master", student_rows), ("timetable_pattern", timetable_rows)):
+        columns = SNAPSHOT_COLUMNS[table_name]
+        encoded = sorted(
+            json.dumps([row.get(column) for column in columns], ensure_ascii=False, default=str) for row in rows
+        )
+        digest.update(f"{table_name}\n".encode("utf-8"))
+        for line in encoded:
+            digest.update(f"{line}\n".encode("utf-8"))
+        counts.append(len(encoded))
+    return f"{digest.hexdigest()}:{counts[0]}:{counts[1]}"
+
+
+def local_dataset_fingerprint(conn: sqlite3.Connection) -> str:
+    # 저장된 메타 값 대신 현재 테이블에서 다시 계산한다. 되돌리기/초기화/증분 동기화로 테이블만 바뀐 경우에도 정확하다.
+    return compute_dataset_fingerprint(export_rows(conn, "student_master"), export_rows(conn, "timetable_pattern"))
+
+
+def export_rows(conn: sqlite3.Connection, table_name: str, suffix: str = "") -> list[dict[str, object]]:
+    columns = SNAPSHOT_COLUMNS[table_name]
+    cursor = conn.execute(f"SELECT {', '.join(columns)} FROM {table_name}{suffix}")
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def has_previous_snapshot(conn: sqlite3.Connection) -> bool:
+    return all(_table_exists(conn, f"{table_name}{PREV_SUFFIX}") for table_name in SNAPSHOT_COLUMNS)
+
+
+def previous_snapshot_fingerprint(conn: sqlite3.Connection) -> str:
+    return compute_dataset_fingerprint(
+        export_rows(conn, "student_master", PREV_SUFFIX), export_rows(conn, "timetable_pattern", PREV_SUFFIX)
+    )
+
+
+def rollback_snapshot(conn: sqlite3.Connection, expected_fingerprint: str | None = None) -> bool:
+    # 운영 테이블과 *_prev 테이블을 맞바꾼다. 한 번 더 실행하면 다시 원래 데이터로 돌아온다.
+    if not has_previous_snapshot(conn):
+        return False
+    with conn:
+        _begin(conn)
+        # 잠금 없이 원격에 먼저 반영한 경우, 그 사이 다른 업로드로 *_prev 가 바뀌었으면 맞바꾸지 않는다.
+        if expected_fingerprint is not None and previous_snapshot_fingerprint(conn) != expected_fingerprint:
+            raise RuntimeError("되돌리기 대상 데이터가 그 사이 바뀌었습니다. 화면을 새로 고친 뒤 다시 시도해 주세요.")
+        for table_name in SNAPSHOT_COLUMNS:
+            swap = f"{table_name}{SWAP_SUFFIX}"
+            conn.execute(f"DROP TABLE IF EXISTS {swap}")
+            _swap_tables(conn, table_name, f"{table_name}{PREV_SUFFIX}", swap)
+            conn.execute(f"ALTER TABLE {swap} RENAME TO {table_name}{PREV_SUFFIX}")
+        meta = dict(
+            conn.execute(
+                "SELECT meta_key, meta_value FROM app_meta WHERE meta_key IN (?, ?)",
+                (LAST_UPDATED_AT_KEY, PREVIOUS_UPDATED_AT_KEY),
+            ).fetchall()
+        )
+        conn.execute(
+            "DELETE FROM app_meta WHERE meta_key IN (?, ?)", (LAST_UPDATED_AT_KEY, PREVIOUS_UPDATED_AT_KEY)
         )
+        if PREVIOUS_UPDATED_AT_KEY in meta:
+            _upsert_meta(conn, LAST_UPDATED_AT_KEY, meta[PREVIOUS_UPDATED_AT_KEY])
+        if LAST_UPDATED_AT_KEY in meta:
+            _upsert_meta(conn, PREVIOUS_UPDATED_AT_KEY, meta[LAST_UPDATED_AT_KEY])
+        _bump_data_version(conn)
+    return True
+
+
+def _upsert_meta(conn: sqlite3.Connection, key: str, value: str) -> None:
+    conn.execute(
+        """
+        INSERT INTO app_meta(meta_key, meta_value)
+        VALUES (?, ?)
+        ON CONFLICT(meta_key) DO UPDATE SET meta_value = excluded.meta_value
+        """,
+        (key, value),
+    )
+
+
+def set_meta(conn: sqlite3.Connection, key: str, value: str, *, bump_version: bool = True) -> None:
+    with conn:
+        _upsert_meta(conn, key, value)
+        if bump_version:
+            _bump_data_version(conn)
+
+
+def get_meta(conn: sqlite3.Connection, key: str) -> str | None:
+    row = conn.execute("SELECT meta_value FROM app_meta WHERE meta_key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _bump_data_version(conn: sqlite3.Connection) -> None:
+    # 호출한 쪽의 트랜잭션 안에서 실행되어 데이터 변경과 함께 커밋된다.
+    conn.execute(
+        """
+        INSERT INTO app_meta(meta_key, meta_value)
+        VALUES (?, '1')
+        ON CONFLICT(meta_key) DO UPDATE SET meta_value = CAST(app_meta.meta_value AS INTEGER) + 1
+        """,
+        (DATA_VERSION_KEY,),
+    )
+    # 모든 쓰기 경로가 여기를 지나므로 건수도 같은 트랜잭션에서 app_meta 에 맞춰 둔다.
+    _store_stats(conn)
+
+
+def _store_stats(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        INSERT INTO app_meta(meta_key, meta_value)
+        SELECT meta_key, meta_value FROM (
+            SELECT ? AS meta_key, CAST(COUNT(*) AS TEXT) AS meta_value FROM student_master
+            UNION ALL
+            SELECT ?, CAST(COUNT(*) AS TEXT) FROM timetable_pattern
+        ) WHERE true
+        ON CONFLICT(meta_key) DO UPDATE SET meta_value = excluded.meta_value
+        """,
+        (STUDENT_COUNT_KEY, TIMETABLE_COUNT_KEY),
+    )
+
+
+def _meta_int(value: str | None) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
 
 
 def get_stats(conn: sqlite3.Connection) -> dict[str, object]:
-    student_count = conn.execute("SELECT COUNT(*) FROM student_master").fetchone()[0]
-    timetable_count = conn.execute("SELECT COUNT(*) FROM timetable_pattern").fetchone()[0]
-    updated_at_row = conn.execute(
-        "SELECT meta_value FROM app_meta WHERE meta_key = 'last_updated_at'"
-    ).fetchone()
+    # 건수는 쓰기 경로가 app_meta 에 저장해 두므로 조회는 메타 한 번으로 끝난다.
+    keys = (STUDENT_COUNT_KEY, TIMETABLE_COUNT_KEY, LAST_UPDATED_AT_KEY, DATA_VERSION_KEY)
+    meta = dict(
+        conn.execute(
+            f"SELECT meta_key, meta_value FROM app_meta WHERE meta_key IN ({', '.join('?' for _ in keys)})",
+            keys,
+        ).fetchall()
+    )
+    student_count = _meta_int(meta.get(STUDENT_COUNT_KEY))
+    timetable_count = _meta_int(meta.get(TIMETABLE_COUNT_KEY))
+    if student_count is None or timetable_count is None:
+        # 건수가 저장되기 전의 DB(초기화 전 읽기 연결)만 직접 센다.
+        student_count = conn.execute("SELECT COUNT(*) FROM student_master").fetchone()[0]
+        timetable_count = conn.execute("SELECT COUNT(*) FROM timetable_pattern").fetchone()[0]
     return {
         "student_count": student_count,
         "timetable_count": timetable_count,
-        "last_updated_at": updated_at_row[0] if updated_at_row else None,
+        "last_updated_at": meta.get(LAST_UPDATED_AT_KEY),
+        "data_version": _meta_int(meta.get(DATA_VERSION_KEY)) or 0,
     }
 
 
 def clear_all_data(conn: sqlite3.Connection) -> None:
     with conn:
+        _begin(conn)
         conn.execute("DELETE FROM student_master")
         conn.execute("DELETE FROM timetable_pattern")
-        conn.execute("DELETE FROM app_meta")
+        conn.execute("DELETE FROM resolved_schedule")
+        # 되돌리기용 *_prev 와 남은 *_next/*_swap 도 같이 지워야 초기화 후 학생 데이터가 남지 않는다.
+        for table_name in SNAPSHOT_COLUMNS:
+            for suffix in (NEXT_SUFFIX, PREV_SUFFIX, SWAP_SUFFIX):
+                conn.execute(f"DROP TABLE IF EXISTS {table_name}{suffix}")
+        # 데이터 버전은 지우지 않고 올려야 다른 세션의 캐시가 확실히 무효화된다.
+        conn.execute("DELETE FROM app_meta WHERE meta_key <> ?", (DATA_VERSION_KEY,))
+        _bump_data_version(conn)
 
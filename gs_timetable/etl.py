@@ -1,22 +1,59 @@
 from __future__ import annotations
 
+import codecs
 import csv
 import io
 import re
 from dataclasses import dataclass
-from typing import Any
+from pathlib import Path
+from typing import Any, Callable
 
 import pandas as pd
 
+from . import parse_cache
+from .blocks import infer_block_code_from_subject, normalize_block
 from .constants import UPLOAD_EXCEPTION_RULES, WEEKDAYS
 
 
+TIMETABLE_COLUMN_ALIASES = {
+    "class_no": ["반", "학급", "class", "class_no"],
+    "weekday": ["요일", "day", "weekday"],
+    "period": ["교시", "period"],
+    "block_code": ["수업블록", "블록", "block", "block_code"],
+    "subject_teacher": ["과목명/교사", "과목교사", "subject_teacher"],
+    "subject_name": ["과목명", "과목", "subject"],
+    "teacher_name": ["교사", "담당교사", "선생님", "teacher"],
+    "exception_location": ["예외장소", "exception_location"],
+}
+# 파싱 규칙이 바뀌면 올려서 이전에 캐시된 파싱 결과를 무효화한다.
+PARSER_VERSION = 1
+SNIFF_CHARS = 4096
+HEADER_SCAN_ROWS = 40
+ENCODING_SAMPLE_BYTES = 64 * 1024
+CSV_ENCODINGS = ("utf-8", "cp949")
+_SECTION_TITLE_RE = re.compile(r"\d+\s*학년\s*\d+\s*반")
+
+
 @dataclass
 class ParseResult:
     rows: list[dict[str, Any]]
     warnings: list[str]
 
 
+@dataclass
+class UploadedBytes:
+    # Streamlit 업로드 객체는 프로세스 간에 넘길 수 없으므로 이름과 내용만 담아 전달한다.
+    name: str
+    data: bytes
+
+    @classmethod
+    def from_upload(cls, uploaded_file: Any) -> UploadedBytes:
+        return cls(name=getattr(uploaded_file, "name", "") or "", data=uploaded_file.getvalue())
+
+    def getvalue(self) -> bytes:
+        return self.data
+
+
 def read_tabular_file(uploaded_file: Any) -> pd.DataFrame:
     name = (getattr(uploaded_file, "name", "") or "").lower()
     raw = uploaded_file.getvalue()
@@ -25,55 +62,156 @@ def read_tabular_file(uploaded_file: Any) -> pd.DataFrame:
         return pd.read_excel(io.BytesIO(raw))
 
     if name.endswith(".csv"):
-        return _read_csv_dataframe_from_bytes(raw)
+        return _read_csv_dataframe(decode_csv_bytes(raw))
 
     raise ValueError("지원하지 않는 파일 형식입니다. CSV/XLSX/XLS만 지원합니다.")
 
 
-def parse_student_master_file(uploaded_file: Any, default_grade: int = 2) -> ParseResult:
+def _parse_with_cache(
+    kind: str,
+    uploaded_file: Any,
+    params: tuple[Any, ...],
+    parse: Callable[[], ParseResult],
+    use_cache: bool,
+) -> ParseResult:
+    if not use_cache:
+        return parse()
+
+    name = (getattr(uploaded_file, "name", "") or "").lower()
+    # 파일 형식에 따라 파서가 달라지므로 확장자도 키에 넣는다.
+    key = parse_cache.make_key(kind, uploaded_file.getvalue(), PARSER_VERSION, Path(name).suffix, *params)
+    cached = parse_cache.load(key)
+    if cached is not None and isinstance(cached.get("rows"), list) and isinstance(cached.get("warnings"), list):
+        return ParseResult(rows=cached["rows"], warnings=cached["warnings"])
+
+    result = parse()
+    parse_cache.store(key, {"rows": result.rows, "warnings": result.warnings})
+    return result
+
+
+def parse_student_master_file(uploaded_file: Any, default_grade: int = 2, use_cache: bool = True) -> ParseResult:
+    return _parse_with_cache(
+        "student",
+        uploaded_file,
+        (default_grade,),
+        lambda: _parse_student_master_upload(uploaded_file, default_grade=default_grade),
+        use_cache,
+    )
+
+
+def parse_timetable_pattern_file(
+    uploaded_file: Any, target_grade: int | None = 2, use_cache: bool = True
+) -> ParseResult:
+    return _parse_with_cache(
+        "timetable",
+        uploaded_file,
+        (target_grade,),
+        lambda: _parse_timetable_pattern_upload(uploaded_file, target_grade=target_grade),
+        use_cache,
+    )
+
+
+def _parse_student_master_upload(uploaded_file: Any, default_grade: int) -> ParseResult:
     name = (getattr(uploaded_file, "name", "") or "").lower()
     raw = uploaded_file.getvalue()
 
     if name.endswith((".xlsx", ".xls")):
-        special_result = _try_parse_special_student_excel(raw, default_grade=default_grade)
-        if special_result is not None:
-            return special_result
+        try:
+            excel = pd.ExcelFile(io.BytesIO(raw))
+        except Exception:
+            excel = None
+        if excel is not None:
+            # 통합문서는 한 번만 열고, 특수 양식이 아니면 같은 파일 객체로 첫 시트를 읽는다.
+            with excel:
+                special_result = _try_parse_special_student_excel(excel, default_grade=default_grade)
+                if special_result is not None:
+                    return special_result
+                return parse_student_master(pd.read_excel(excel), default_grade=default_grade)
 
     df = read_tabular_file(uploaded_file)
     return parse_student_master(df, default_grade=default_grade)
 
 
-def parse_timetable_pattern_file(uploaded_file: Any, target_grade: int | None = 2) -> ParseResult:
-    raw = uploaded_file.getvalue()
-    try:
-        df = read_tabular_file(uploaded_file)
-        return parse_timetable_pattern(df)
-    except Exception as standard_error:
-        name = (getattr(uploaded_file, "name", "") or "").lower()
-        if not name.endswith(".csv"):
-            raise
+def _parse_timetable_pattern_upload(uploaded_file: Any, target_grade: int | None) -> ParseResult:
+    name = (getattr(uploaded_file, "name", "") or "").lower()
+    if not name.endswith(".csv"):
+        return parse_timetable_pattern(read_tabular_file(uploaded_file))
+
+    text = decode_csv_bytes(uploaded_file.getvalue())
+    parsers = {
+        "tabular": lambda: parse_timetable_pattern(_read_csv_dataframe(text)),
+        "sectioned": lambda: _parse_sectioned_timetable_csv(text, target_grade=target_grade),
+    }
+    # 앞부분만 보고 맞는 파서부터 시도한다. 판단이 틀렸을 때만 나머지 파서로 한 번 더 읽는다.
+    order = ["sectioned", "tabular"] if sniff_timetable_csv_layout(text) == "sectioned" else ["tabular", "sectioned"]
+    errors: dict[str, Exception] = {}
+    for layout in order:
         try:
-            return _parse_sectioned_timetable_csv(raw, target_grade=target_grade)
-        except Exception:
-            raise standard_error
+            return parsers[layout]()
+        except Exception as error:
+            errors[layout] = error
+    raise errors["tabular"]
+
+
+def sniff_timetable_csv_layout(text: str) -> str | None:
+    head = text[:SNIFF_CHARS]
+    if len(text) > SNIFF_CHARS:
+        head = head[: head.rfind("\n") + 1] or head
+
+    rows = [row for row in csv.reader(io.StringIO(head)) if any(cell.strip() for cell in row)]
+    if not rows:
+        return None
+
+    header = {normalize_header(cell) for cell in rows[0]}
+    required = ("class_no", "weekday", "period")
+    if all(header & {normalize_header(alias) for alias in TIMETABLE_COLUMN_ALIASES[key]} for key in required):
+        return "tabular"
 
+    for row in rows:
+        first = row[0].strip()
+        if "시간표" in first and "반" in first and (
+            _SECTION_TITLE_RE.search(first) or len(re.findall(r"\d+", first)) >= 2
+        ):
+            return "sectioned"
+    return None
 
-def _read_csv_dataframe_from_bytes(raw: bytes) -> pd.DataFrame:
-    for enc in ("utf-8-sig", "cp949", "euc-kr", "utf-8"):
+
+def detect_csv_encoding(raw: bytes) -> str:
+    if raw.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+
+    sample = raw[:ENCODING_SAMPLE_BYTES]
+    if len(raw) > ENCODING_SAMPLE_BYTES:
+        # 줄바꿈 바이트는 UTF-8/CP949 멀티바이트 문자 안에 나오지 않으므로 여기서 자르면 문자가 깨지지 않는다.
+        sample = sample[: sample.rfind(b"\n") + 1] or sample
+    for enc in CSV_ENCODINGS:
         try:
-            return pd.read_csv(io.BytesIO(raw), encoding=enc)
+            sample.decode(enc)
+            return enc
         except UnicodeDecodeError:
             continue
     raise ValueError("CSV 인코딩을 읽을 수 없습니다. UTF-8 또는 CP949로 저장해 주세요.")
 
 
-def _decode_csv_text(raw: bytes) -> str:
-    for enc in ("cp949", "euc-kr", "utf-8-sig", "utf-8"):
+def decode_csv_bytes(raw: bytes) -> str:
+    encoding = detect_csv_encoding(raw)
+    try:
+        return raw.decode(encoding)
+    except UnicodeDecodeError:
+        pass
+    # 앞부분 표본과 뒷부분 인코딩이 다른 드문 경우에만 나머지 후보로 다시 해석한다.
+    for enc in CSV_ENCODINGS:
+        if enc == encoding:
+            continue
         try:
             return raw.decode(enc)
         except UnicodeDecodeError:
             continue
-    raise ValueError("CSV 텍스트를 해석할 수 없습니다. CP949 또는 UTF-8로 저장해 주세요.")
+    raise ValueError("CSV 인코딩을 읽을 수 없습니다. UTF-8 또는 CP949로 저장해 주세요.")
+
+
+def _read_csv_dataframe(text: str) -> pd.DataFrame:
+    return pd.read_csv(io.StringIO(text))
 
 
 def normalize_header(value: Any) -> str:
@@ -129,7 +267,66 @@ def normalize_block_code(value: Any) -> str | None:
     text = clean_text(value)
     if not text:
         return None
-    return re.sub(r"\s+", "", text)
+    return normalize_block(text)
+
+
+def _none_for_missing(series: pd.Series) -> pd.Series:
+    return series.astype(object).where(series.notna(), None)
+
+
+def _empty_series(index: pd.Index) -> pd.Series:
+    return pd.Series(pd.NA, index=index, dtype="string")
+
+
+def _column_or_empty(df: pd.DataFrame, column: str | None) -> pd.Series:
+    # 스칼라 경로의 item.get(column) 과 같이 없는 컬럼은 빈 값으로 본다.
+    if column is None or column not in df.columns:
+        return _empty_series(df.index)
+    return df[column]
+
+
+def _mask(series: pd.Series) -> pd.Series:
+    return series.fillna(False).astype(bool)
+
+
+def _to_text_series(series: pd.Series) -> pd.Series:
+    # 값마다 str(value) 를 적용해 스칼라 경로와 같은 문자열을 만든 뒤, 이후 처리는 문자열 연산으로 한다.
+    return series.astype(object).map(str, na_action="ignore").astype("string")
+
+
+def clean_text_series(series: pd.Series) -> pd.Series:
+    text = _to_text_series(series).str.strip()
+    return text.where(text != "")
+
+
+def clean_code_text_series(series: pd.Series) -> pd.Series:
+    text = clean_text_series(series)
+    # 엑셀에서 숫자로 읽힌 교실 값(401.0)은 정수 문자열로 되돌린다.
+    float_like = _mask(text.str.fullmatch(r"-?\d+\.0+"))
+    if float_like.any():
+        converted = text[float_like].map(lambda value: str(int(float(value))))
+        text = text.mask(float_like, converted)
+    return text
+
+
+def _digits_to_int(series: pd.Series) -> pd.Series:
+    return pd.Series(
+        [int(value) if isinstance(value, str) else None for value in series.astype(object)],
+        index=series.index,
+        dtype=object,
+    )
+
+
+def to_int_series(series: pd.Series) -> pd.Series:
+    # to_int 과 같이 마지막 숫자 묶음을 정수로 쓴다.
+    text = _to_text_series(series).str.strip()
+    return _digits_to_int(text.str.extract(r"(\d+)\D*$", expand=False))
+
+
+def _records(columns: dict[str, pd.Series], keep: pd.Series) -> list[dict[str, Any]]:
+    names = list(columns)
+    values = [_none_for_missing(columns[name][keep]).tolist() for name in names]
+    return [dict(zip(names, row)) for row in zip(*values)]
 
 
 def _pick_column(columns: dict[str, str], aliases: list[str]) -> str | None:
@@ -167,37 +364,73 @@ def _derive_exception_location(subject_name: str | None, subject_teacher: str) -
     return None
 
 
-def _parse_student_id(student_id: str | None) -> tuple[int | None, int | None]:
-    if not student_id:
-        return None, None
-    digits = re.sub(r"\D", "", student_id)
-    if len(digits) < 4:
-        return None, None
-    middle = digits[1:-2]
-    if not middle:
-        return None, None
-    return int(middle), int(digits[-2:])
+def _split_subject_teacher_series(subject_teacher: pd.Series) -> tuple[pd.Series, pd.Series]:
+    # _split_subject_teacher 와 같은 규칙: "/" 가 있으면 첫 "/" 기준, 아니면 마지막 공백 기준으로 나눈다.
+    has_slash = _mask(subject_teacher.str.contains("/", regex=False))
+    has_space = ~has_slash & _mask(subject_teacher.str.contains(" ", regex=False))
+    by_slash = subject_teacher.str.split("/", n=1)
+    by_space = subject_teacher.str.rsplit(" ", n=1)
 
+    def part(position: int) -> pd.Series:
+        picked = _empty_series(subject_teacher.index)
+        picked = picked.mask(has_slash, by_slash.str.get(position)).mask(has_space, by_space.str.get(position))
+        return picked.astype("string").str.strip()
 
-def _parse_class_from_homeroom(homeroom: str | None) -> int | None:
-    if not homeroom:
-        return None
-    if "-" in homeroom:
-        parts = re.findall(r"\d+", homeroom)
-        if parts:
-            return int(parts[-1])
-    digits = re.findall(r"\d+", homeroom)
-    if digits:
-        return int(digits[0])
-    return None
+    subject = part(0).mask(~has_slash & ~has_space, subject_teacher)
+    teacher = part(1)
+    return subject.where(subject != ""), teacher.where(teacher != "")
 
 
-def _try_parse_special_student_excel(raw: bytes, default_grade: int) -> ParseResult | None:
-    try:
-        excel = pd.ExcelFile(io.BytesIO(raw))
-    except Exception:
-        return None
+def _build_subject_teacher_series(subject_name: pd.Series, teacher_name: pd.Series) -> pd.Series:
+    combined = subject_name + " / " + teacher_name
+    return combined.fillna(subject_name).fillna(teacher_name).fillna("미입력")
+
+
+def _derive_exception_location_series(subject_name: pd.Series, subject_teacher: pd.Series) -> pd.Series:
+    haystack = (subject_name.fillna("") + " " + subject_teacher).str.replace(" ", "", regex=False)
+    derived = _empty_series(haystack.index)
+    # 규칙 순서대로 먼저 맞는 키워드가 이기도록 뒤에서부터 덮어쓴다.
+    for keyword, location in reversed(list(UPLOAD_EXCEPTION_RULES.items())):
+        derived = derived.mask(_mask(haystack.str.contains(keyword, regex=False)), location)
+    return derived
 
+
+def _normalize_weekday_series(series: pd.Series) -> pd.Series:
+    compact = clean_text_series(series).str.replace("요일", "", regex=False).str.strip()
+    mapping = {"mon": "월", "tue": "화", "wed": "수", "thu": "목", "fri": "금"}
+    english = compact.str.lower().str[:3].map(mapping).astype("string")
+    return compact.where(_mask(compact.isin(WEEKDAYS)), english)
+
+
+def _parse_student_id_series(student_ids: pd.Series) -> tuple[pd.Series, pd.Series]:
+    digits = student_ids.str.replace(r"\D", "", regex=True)
+    valid = _mask(digits.str.len().ge(4))
+    middle = digits.str[1:-2].where(valid)
+    tail = digits.str[-2:].where(valid)
+    return _digits_to_int(middle), _digits_to_int(tail)
+
+
+def _parse_class_from_homeroom_series(homerooms: pd.Series) -> pd.Series:
+    has_dash = _mask(homerooms.str.contains("-", regex=False))
+    last_digits = homerooms.str.extract(r"(\d+)\D*$", expand=False)
+    first_digits = homerooms.str.extract(r"(\d+)", expand=False)
+    return _digits_to_int(first_digits.where(~has_dash, last_digits))
+
+
+def _synthesize_student_ids(default_grade: int, class_no: pd.Series, student_no: pd.Series) -> pd.Series:
+    known = class_no.notna() & student_no.notna()
+    synthesized = _empty_series(class_no.index)
+    if known.any():
+        # f"{grade}{class_no:02d}{student_no:02d}" 와 같은 형식 (값은 항상 0 이상의 정수)
+        synthesized[known] = (
+            str(default_grade)
+            + class_no[known].astype(str).astype("string").str.zfill(2)
+            + student_no[known].astype(str).astype("string").str.zfill(2)
+        )
+    return synthesized
+
+
+def _try_parse_special_student_excel(excel: pd.ExcelFile, default_grade: int) -> ParseResult | None:
     # Some users re-save the workbook and sheet order changes.
     # Search every sheet instead of assuming "기초자료" is always the first sheet.
     preferred_sheets: list[str] = []
@@ -209,22 +442,27 @@ def _try_parse_special_student_excel(raw: bytes, default_grade: int) -> ParseRes
             other_sheets.append(sheet_name)
 
     for sheet_name in [*preferred_sheets, *other_sheets]:
+        # 머리글은 앞쪽 HEADER_SCAN_ROWS 행 안에서만 찾으므로 그만큼만 읽어 보고, 고른 시트만 전체를 읽는다.
         try:
-            df = pd.read_excel(excel, sheet_name=sheet_name, header=None)
+            window = pd.read_excel(excel, sheet_name=sheet_name, header=None, nrows=HEADER_SCAN_ROWS)
         except Exception:
             continue
 
-        header_row = _find_special_student_header_row(df)
+        header_row = _find_special_student_header_row(window)
         if header_row is None:
             continue
 
+        try:
+            df = pd.read_excel(excel, sheet_name=sheet_name, header=None)
+        except Exception:
+            continue
         return _parse_special_student_layout(df, header_row=header_row, default_grade=default_grade)
 
     return None
 
 
 def _find_special_student_header_row(df: pd.DataFrame) -> int | None:
-    max_rows = min(len(df), 40)
+    max_rows = min(len(df), HEADER_SCAN_ROWS)
     for idx in range(max_rows):
         raw_row = df.iloc[idx, :12].tolist()
         row = [clean_text(v) for v in raw_row]
@@ -257,44 +495,46 @@ def _find_special_student_header_row(df: pd.DataFrame) -> int | None:
 
 
 def _parse_special_student_layout(df: pd.DataFrame, header_row: int, default_grade: int) -> ParseResult:
-    rows: list[dict[str, Any]] = []
-    warnings: list[str] = []
-    seen_ids: set[str] = set()
-
-    for row_idx in range(header_row + 1, len(df)):
-        record = df.iloc[row_idx]
-        student_name = clean_text(record.iloc[11]) if len(record) > 11 else None
-        class_no = to_int(record.iloc[9]) if len(record) > 9 else None
-        student_no = to_int(record.iloc[10]) if len(record) > 10 else None
-
-        if not student_name and class_no is None and student_no is None:
-            continue
-        if not student_name or class_no is None or student_no is None:
-            warnings.append(f"학생 행 {row_idx + 1}: 필수값 누락으로 제외")
-            continue
-
-        student_id = f"{default_grade}{class_no:02d}{student_no:02d}"
-        if student_id in seen_ids:
-            warnings.append(f"중복 학번 제외: {student_id}")
-            continue
-        seen_ids.add(student_id)
-
-        rows.append(
-            {
-                "student_id": student_id,
-                "student_name": student_name,
-                "class_no": class_no,
-                "student_no": student_no,
-                "homeroom_location": clean_code_text(record.iloc[0]) if len(record) > 0 else None,
-                "move_classroom": clean_code_text(record.iloc[1]) if len(record) > 1 else None,
-                "basic1_classroom": clean_code_text(record.iloc[2]) if len(record) > 2 else None,
-                "basic2_classroom": clean_code_text(record.iloc[3]) if len(record) > 3 else None,
-                "inquiry1_classroom": clean_code_text(record.iloc[4]) if len(record) > 4 else None,
-                "inquiry2_classroom": clean_code_text(record.iloc[5]) if len(record) > 5 else None,
-                "inquiry3_classroom": clean_code_text(record.iloc[6]) if len(record) > 6 else None,
-                "liberal_classroom": clean_code_text(record.iloc[7]) if len(record) > 7 else None,
-            }
-        )
+    body = df.iloc[header_row + 1 :]
+    width = body.shape[1]
+
+    def column(position: int) -> pd.Series:
+        return body.iloc[:, position] if width > position else _empty_series(body.index)
+
+    student_name = clean_text_series(column(11))
+    class_no = to_int_series(column(9))
+    student_no = to_int_series(column(10))
+
+    has_any = student_name.notna() | class_no.notna() | student_no.notna()
+    complete = student_name.notna() & class_no.notna() & student_no.notna()
+    student_id = _synthesize_student_ids(default_grade, class_no, student_no)
+    duplicated = complete & student_id.where(complete).duplicated(keep="first")
+
+    warning_text = pd.Series(None, index=body.index, dtype=object)
+    line_numbers = pd.Series([str(line) for line in range(header_row + 2, header_row + 2 + len(body))], index=body.index)
+    missing = has_any & ~complete
+    warning_text[missing] = "학생 행 " + line_numbers[missing] + ": 필수값 누락으로 제외"
+    warning_text[duplicated] = "중복 학번 제외: " + student_id[duplicated]
+    warnings = warning_text.dropna().tolist()
+
+    keep = complete & ~duplicated
+    rows = _records(
+        {
+            "student_id": student_id,
+            "student_name": student_name,
+            "class_no": class_no,
+            "student_no": student_no,
+            "homeroom_location": clean_code_text_series(column(0)),
+            "move_classroom": clean_code_text_series(column(1)),
+            "basic1_classroom": clean_code_text_series(column(2)),
+            "basic2_classroom": clean_code_text_series(column(3)),
+            "inquiry1_classroom": clean_code_text_series(column(4)),
+            "inquiry2_classroom": clean_code_text_series(column(5)),
+            "inquiry3_classroom": clean_code_text_series(column(6)),
+            "liberal_classroom": clean_code_text_series(column(7)),
+        },
+        keep,
+    )
 
     if not rows:
         raise ValueError("기초자료 시트에서 학생 데이터를 추출하지 못했습니다.")
@@ -326,98 +566,63 @@ def parse_student_master(df: pd.DataFrame, default_grade: int = 2) -> ParseResul
     if not picked["student_id"] and not (picked["class_no"] and picked["student_no"]):
         raise ValueError("학생 파일에서 `학번` 또는 `반`+`번호` 컬럼을 찾지 못했습니다.")
 
-    rows: list[dict[str, Any]] = []
-    warnings: list[str] = []
-    seen_ids: set[str] = set()
-
-    for idx, item in df.iterrows():
-        student_name = clean_text(item.get(picked["student_name"])) if picked["student_name"] else None
-        if not student_name:
-            continue
-
-        student_id = clean_text(item.get(picked["student_id"])) if picked["student_id"] else None
-        homeroom_location = (
-            clean_code_text(item.get(picked["homeroom_location"])) if picked["homeroom_location"] else None
-        )
-        class_no = to_int(item.get(picked["class_no"])) if picked["class_no"] else None
-        student_no = to_int(item.get(picked["student_no"])) if picked["student_no"] else None
-
-        if student_id and (class_no is None or student_no is None):
-            parsed_class, parsed_no = _parse_student_id(student_id)
-            class_no = class_no if class_no is not None else parsed_class
-            student_no = student_no if student_no is not None else parsed_no
-
-        if class_no is None:
-            class_no = _parse_class_from_homeroom(homeroom_location)
-
-        if not student_id and class_no is not None and student_no is not None:
-            student_id = f"{default_grade}{class_no:02d}{student_no:02d}"
-
-        if not student_id:
-            warnings.append(f"학생 행 {idx + 2}: 학번 생성 실패로 제외")
-            continue
-
-        student_id = re.sub(r"\D", "", student_id)
-        if not student_id:
-            warnings.append(f"학생 행 {idx + 2}: 학번 형식 오류로 제외")
-            continue
-        if student_id in seen_ids:
-            warnings.append(f"중복 학번 제외: {student_id}")
-            continue
-        seen_ids.add(student_id)
-
-        rows.append(
-            {
-                "student_id": student_id,
-                "student_name": student_name,
-                "class_no": class_no,
-                "student_no": student_no,
-                "homeroom_location": homeroom_location,
-                "move_classroom": clean_code_text(item.get(picked["move_classroom"])) if picked["move_classroom"] else None,
-                "basic1_classroom": clean_code_text(item.get(picked["basic1_classroom"])) if picked["basic1_classroom"] else None,
-                "basic2_classroom": clean_code_text(item.get(picked["basic2_classroom"])) if picked["basic2_classroom"] else None,
-                "inquiry1_classroom": clean_code_text(item.get(picked["inquiry1_classroom"])) if picked["inquiry1_classroom"] else None,
-                "inquiry2_classroom": clean_code_text(item.get(picked["inquiry2_classroom"])) if picked["inquiry2_classroom"] else None,
-                "inquiry3_classroom": clean_code_text(item.get(picked["inquiry3_classroom"])) if picked["inquiry3_classroom"] else None,
-                "liberal_classroom": clean_code_text(item.get(picked["liberal_classroom"])) if picked["liberal_classroom"] else None,
-            }
-        )
+    def column(key: str) -> pd.Series:
+        return _column_or_empty(df, picked[key])
+
+    student_name = clean_text_series(column("student_name"))
+    named = student_name.notna()
+
+    student_id = clean_text_series(column("student_id"))
+    homeroom_location = clean_code_text_series(column("homeroom_location"))
+    class_no = to_int_series(column("class_no"))
+    student_no = to_int_series(column("student_no"))
+
+    # 반/번호가 비어 있으면 학번(2 + 반 2자리 + 번호 2자리)에서 보충한다.
+    parsed_class, parsed_no = _parse_student_id_series(student_id)
+    needs_parse = student_id.notna() & (class_no.isna() | student_no.isna())
+    class_no = class_no.where(~(needs_parse & class_no.isna()), parsed_class)
+    student_no = student_no.where(~(needs_parse & student_no.isna()), parsed_no)
+    class_no = class_no.where(class_no.notna(), _parse_class_from_homeroom_series(homeroom_location))
+
+    student_id = student_id.where(student_id.notna(), _synthesize_student_ids(default_grade, class_no, student_no))
+    missing_id = named & student_id.isna()
+    student_id = student_id.str.replace(r"\D", "", regex=True)
+    bad_id = named & ~missing_id & _mask(student_id.eq(""))
+    candidate = named & ~missing_id & ~bad_id
+    duplicated = candidate & student_id.where(candidate).duplicated(keep="first")
+
+    warning_text = pd.Series(None, index=df.index, dtype=object)
+    line_numbers = pd.Series(df.index, index=df.index).map(lambda idx: str(idx + 2))
+    warning_text[missing_id] = "학생 행 " + line_numbers[missing_id] + ": 학번 생성 실패로 제외"
+    warning_text[bad_id] = "학생 행 " + line_numbers[bad_id] + ": 학번 형식 오류로 제외"
+    warning_text[duplicated] = "중복 학번 제외: " + student_id[duplicated]
+    warnings = warning_text.dropna().tolist()
+
+    keep = candidate & ~duplicated
+    rows = _records(
+        {
+            "student_id": student_id,
+            "student_name": student_name,
+            "class_no": class_no,
+            "student_no": student_no,
+            "homeroom_location": homeroom_location,
+            "move_classroom": clean_code_text_series(column("move_classroom")),
+            "basic1_classroom": clean_code_text_series(column("basic1_classroom")),
+            "basic2_classroom": clean_code_text_series(column("basic2_classroom")),
+            "inquiry1_classroom": clean_code_text_series(column("inquiry1_classroom")),
+            "inquiry2_classroom": clean_code_text_series(column("inquiry2_classroom")),
+            "inquiry3_classroom": clean_code_text_series(column("inquiry3_classroom")),
+            "liberal_classroom": clean_code_text_series(column("liberal_classroom")),
+        },
+        keep,
+    )
 
     if not rows:
         raise ValueError("학생 파일에서 유효한 학생 데이터를 만들지 못했습니다.")
     return ParseResult(rows=rows, warnings=warnings)
 
 
-def _infer_block_code_from_subject(subject_name: str | None) -> str:
-    subject = normalize_block_code(subject_name) or ""
-    if not subject:
-        return "이동반"
-
-    if subject.startswith("기1"):
-        return "기초1"
-    if subject.startswith("기2"):
-        return "기초2"
-    if subject.startswith("탐1"):
-        return "탐1"
-    if subject.startswith("탐2"):
-        return "탐2"
-    if subject.startswith("탐3"):
-        return "탐3"
-    if subject.startswith("정보") or subject.startswith("철학"):
-        return "교양"
-    if subject.startswith("동아리"):
-        return "동아리"
-    if subject.startswith("진로2"):
-        return "진로2"
-    if subject.startswith("스포츠"):
-        return "스포츠"
-    if subject.startswith("공강"):
-        return "공강"
-    return "이동반"
-
-
-def _parse_sectioned_timetable_csv(raw: bytes, target_grade: int | None = 2) -> ParseResult:
-    text = _decode_csv_text(raw)
+def _parse_sectioned_timetable_csv(text: str, target_grade: int | None = 2) -> ParseResult:
     reader = csv.reader(io.StringIO(text))
     parsed_rows: list[dict[str, Any]] = []
     warnings: list[str] = []
@@ -472,7 +677,7 @@ def _parse_sectioned_timetable_csv(raw: bytes, target_grade: int | None = 2) ->
 
             subject_name, teacher_name = _split_subject_teacher(cell)
             subject_teacher = _build_subject_teacher(subject_name, teacher_name)
-            block_code = _infer_block_code_from_subject(subject_name or cell)
+            block_code = infer_block_code_from_subject(subject_name or cell)
             exception_location = _derive_exception_location(subject_name, subject_teacher)
 
             key = (current_class, weekday, period)
@@ -504,16 +709,7 @@ def parse_timetable_pattern(df: pd.DataFrame) -> ParseResult:
         raise ValueError("시간표 파일이 비어 있습니다.")
 
     columns = {normalize_header(col): str(col) for col in df.columns}
-    picked = {
-        "class_no": _pick_column(columns, ["반", "학급", "class", "class_no"]),
-        "weekday": _pick_column(columns, ["요일", "day", "weekday"]),
-        "period": _pick_column(columns, ["교시", "period"]),
-        "block_code": _pick_column(columns, ["수업블록", "블록", "block", "block_code"]),
-        "subject_teacher": _pick_column(columns, ["과목명/교사", "과목교사", "subject_teacher"]),
-        "subject_name": _pick_column(columns, ["과목명", "과목", "subject"]),
-        "teacher_name": _pick_column(columns, ["교사", "담당교사", "선생님", "teacher"]),
-        "exception_location": _pick_column(columns, ["예외장소", "exception_location"]),
-    }
+    picked = {key: _pick_column(columns, aliases) for key, aliases in TIMETABLE_COLUMN_ALIASES.items()}
 
     missing = [key for key in ("class_no", "weekday", "period", "block_code") if not picked[key]]
     if missing:
@@ -521,55 +717,52 @@ def parse_timetable_pattern(df: pd.DataFrame) -> ParseResult:
     if not picked["subject_teacher"] and not picked["subject_name"]:
         raise ValueError("시간표 파일에서 `과목명/교사` 또는 `과목명` 컬럼을 찾지 못했습니다.")
 
-    rows: list[dict[str, Any]] = []
-    warnings: list[str] = []
-    seen_keys: set[tuple[int, str, int]] = set()
-
-    for idx, item in df.iterrows():
-        class_no = to_int(item.get(picked["class_no"]))
-        weekday = normalize_weekday(item.get(picked["weekday"]))
-        period = to_int(item.get(picked["period"]))
-        block_code = normalize_block_code(item.get(picked["block_code"]))
-
-        if class_no is None or weekday is None or period is None or not block_code:
-            warnings.append(f"시간표 행 {idx + 2}: 필수값 누락으로 제외")
-            continue
-
-        subject_teacher_raw = (
-            clean_text(item.get(picked["subject_teacher"])) if picked["subject_teacher"] else None
-        )
-        subject_name = clean_text(item.get(picked["subject_name"])) if picked["subject_name"] else None
-        teacher_name = clean_text(item.get(picked["teacher_name"])) if picked["teacher_name"] else None
-
-        if subject_teacher_raw and (not subject_name or not teacher_name):
-            parsed_subject, parsed_teacher = _split_subject_teacher(subject_teacher_raw)
-            subject_name = subject_name or parsed_subject
-            teacher_name = teacher_name or parsed_teacher
-
-        subject_teacher = _build_subject_teacher(subject_name, teacher_name)
-        explicit_exception = (
-            clean_text(item.get(picked["exception_location"])) if picked["exception_location"] else None
-        )
-        exception_location = explicit_exception or _derive_exception_location(subject_name, subject_teacher)
-
-        key = (class_no, weekday, period)
-        if key in seen_keys:
-            warnings.append(f"중복 시간표 키 제외: {class_no}반 {weekday} {period}교시")
-            continue
-        seen_keys.add(key)
-
-        rows.append(
-            {
-                "class_no": class_no,
-                "weekday": weekday,
-                "period": period,
-                "block_code": block_code,
-                "subject_name": subject_name,
-                "teacher_name": teacher_name,
-                "subject_teacher": subject_teacher,
-                "exception_location": exception_location,
-            }
-        )
+    def column(key: str) -> pd.Series:
+        return _column_or_empty(df, picked[key])
+
+    class_no = to_int_series(column("class_no"))
+    weekday = _normalize_weekday_series(column("weekday"))
+    period = to_int_series(column("period"))
+    block_code = clean_text_series(column("block_code")).map(normalize_block, na_action="ignore")
+    complete = class_no.notna() & weekday.notna() & period.notna() & block_code.notna() & _mask(block_code.ne(""))
+
+    subject_teacher_raw = clean_text_series(column("subject_teacher"))
+    parsed_subject, parsed_teacher = _split_subject_teacher_series(subject_teacher_raw)
+    subject_name = clean_text_series(column("subject_name")).fillna(parsed_subject)
+    teacher_name = clean_text_series(column("teacher_name")).fillna(parsed_teacher)
+    subject_teacher = _build_subject_teacher_series(subject_name, teacher_name)
+    exception_location = clean_text_series(column("exception_location")).fillna(
+        _derive_exception_location_series(subject_name, subject_teacher)
+    )
+
+    # 같은 (반, 요일, 교시) 키는 파일에서 먼저 나온 행만 남긴다.
+    keys = pd.DataFrame({"class_no": class_no, "weekday": weekday, "period": period})[complete]
+    duplicated = pd.Series(False, index=df.index)
+    duplicated[complete] = keys.groupby(["class_no", "weekday", "period"], sort=False).cumcount().gt(0)
+
+    warning_text = pd.Series(None, index=df.index, dtype=object)
+    line_numbers = pd.Series(df.index, index=df.index).map(lambda idx: str(idx + 2))
+    warning_text[~complete] = "시간표 행 " + line_numbers[~complete] + ": 필수값 누락으로 제외"
+    if duplicated.any():
+        warning_text[duplicated] = [
+            f"중복 시간표 키 제외: {c}반 {w} {p}교시"
+            for c, w, p in zip(class_no[duplicated], weekday[duplicated], period[duplicated])
+        ]
+    warnings = warning_text.dropna().tolist()
+
+    rows = _records(
+        {
+            "class_no": class_no,
+            "weekday": weekday,
+            "period": period,
+            "block_code": block_code,
+            "subject_name": subject_name,
+            "teacher_name": teacher_name,
+            "subject_teacher": subject_teacher,
+            "exception_location": exception_location,
+        },
+        complete & ~duplicated,
+    )
 
     if not rows:
         raise ValueError("시간표 파일에서 유효한 시간표 데이터를 만들지 못했습니다.")
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from . import cohort, database, etl
+from .constants import DATASET_FINGERPRINT_KEY, LAST_UPDATED_AT_KEY
+from .etl import ParseResult, UploadedBytes
+
+MAX_WORKERS = 2
+
+_pool_lock = threading.Lock()
+_pool: ProcessPoolExecutor | None = None
+
+
+@dataclass
+class IngestResult:
+    student: ParseResult
+    timetable: ParseResult
+    timings: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def warnings(self) -> list[str]:
+        return self.student.warnings + self.timetable.warnings
+
+
+@contextmanager
+def stage_timer(timings: dict[str, float], stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = time.perf_counter() - start
+
+
+def _parse_upload(kind: str, upload: UploadedBytes, grade: int) -> tuple[ParseResult, float]:
+    start = time.perf_counter()
+    if kind == "student":
+        result = etl.parse_student_master_file(upload, default_grade=grade)
+    else:
+        result = etl.parse_timetable_pattern_file(upload, target_grade=grade)
+    return result, time.perf_counter() - start
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Streamlit 은 여러 스레드에서 동작하므로 fork 대신 spawn 으로 작업 프로세스를 만든다.
+            # 프로세스 시작 비용이 크므로 한 번 만든 풀을 업로드마다 재사용한다.
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _discard_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+atexit.register(_discard_pool)
+
+
+def _submit_all(jobs: dict[str, tuple[UploadedBytes, int]]) -> dict[str, Future] | None:
+    try:
+        pool = _get_pool()
+        return {kind: pool.submit(_parse_upload, kind, upload, grade) for kind, (upload, grade) in jobs.items()}
+    except (OSError, RuntimeError, NotImplementedError, BrokenProcessPool):
+        # 프로세스를 만들 수 없는 환경(일부 호스팅/샌드박스)에서는 순차 처리로 대신한다.
+        _discard_pool()
+        return None
+
+
+def _can_parallelize() -> bool:
+    # 코어가 하나뿐이면 프로세스 간 전달 비용만 늘어나므로 순차 처리한다.
+    return (os.cpu_count() or 1) > 1
+
+
+def warm_up() -> None:
+    # 관리자 화면을 열 때 미리 작업 프로세스를 띄워 첫 업로드에서 pandas 로딩을 기다리지 않게 한다.
+    if not _can_parallelize():
+        return
+    try:
+        pool = _get_pool()
+        for _ in range(MAX_WORKERS):
+            pool.submit(_noop)
+    except (OSError, RuntimeError, NotImplementedError, BrokenProcessPool):
+        _discard_pool()
+
+
+def _noop() -> None:
+    return None
+
+
+def parse_uploads(student_file: Any, timetable_file: Any, grade: int, parallel: bool = True) -> IngestResult:
+    # 학생 파일과 시간표 파일은 서로 독립이므로 별도 프로세스에서 동시에 파싱한다.
+    timings: dict[str, float] = {}
+    jobs = {
+        "student": (UploadedBytes.from_upload(student_file), grade),
+        "timetable": (UploadedBytes.from_upload(timetable_file), grade),
+    }
+    results: dict[str, ParseResult] = {}
+
+    with stage_timer(timings, "parse_total"):
+        futures = _submit_all(jobs) if parallel and _can_parallelize() else None
+        if futures is not None:
+            try:
+                for kind, future in futures.items():
+                    results[kind], timings[f"parse_{kind}"] = future.result()
+            except BrokenProcessPool:
+                _discard_pool()
+                results.clear()
+        for kind, (upload, job_grade) in jobs.items():
+            if kind not in results:
+                results[kind], timings[f"parse_{kind}"] = _parse_upload(kind, upload, job_grade)
+
+    return IngestResult(student=results["student"], timetable=results["timetable"], timings=timings)
+
+
+def publish_dataset(
+    conn: sqlite3.Connection,
+    student_rows: list[dict[str, Any]],
+    timetable_rows: list[dict[str, Any]],
+    last_updated_at: str,
+) -> dict[str, database.SyncCounts]:
+    # 새 데이터와 학생별 시간표를 모두 *_next 테이블에 만든 뒤 한 번에 교체한다.
+    # 교체 전까지 학생 화면은 기존 데이터를 그대로 읽는다.
+    meta = {
+        LAST_UPDATED_AT_KEY: last_updated_at,
+        DATASET_FINGERPRINT_KEY: database.compute_dataset_fingerprint(student_rows, timetable_rows),
+    }
+    database.begin_snapshot(conn)
+    try:
+        database.write_snapshot_rows(conn, "student_master", student_rows)
+        database.write_snapshot_rows(conn, "timetable_pattern", timetable_rows)
+        database.write_snapshot_rows(
+            conn,
+            "resolved_schedule",
+            cohort.build_resolved_schedule_rows(conn, source_suffix=database.NEXT_SUFFIX),
+        )
+        counts = {table_name: database.snapshot_diff(conn, table_name) for table_name in database.SNAPSHOT_COLUMNS}
+        if any(item.changed for item in counts.values()):
+            database.swap_snapshot(conn, meta=meta)
+        else:
+            # 같은 데이터를 다시 올리면 교체하지 않는다. 데이터 버전(조회 캐시)과 되돌리기 대상이 그대로 유지된다.
+            database.discard_snapshot(conn)
+            for key, value in meta.items():
+                database.set_meta(conn, key, value, bump_version=False)
+    except Exception:
+        database.discard_snapshot(conn)
+        raise
+    return counts
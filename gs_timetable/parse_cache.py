@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from .constants import PARSE_CACHE_DIR, PARSE_CACHE_MAX_BYTES
+
+SUFFIX = ".json"
+
+
+def make_key(kind: str, raw: bytes, *params: Any) -> str:
+    # 업로드 바이트가 같고 파서 버전/옵션이 같으면 같은 키가 된다.
+    digest = hashlib.sha256(raw)
+    digest.update(json.dumps([kind, *params], ensure_ascii=False, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _entry_path(key: str, directory: Path) -> Path:
+    return directory / f"{key}{SUFFIX}"
+
+
+def load(key: str, directory: Path = PARSE_CACHE_DIR) -> dict[str, Any] | None:
+    path = _entry_path(key, directory)
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+        # 최근 사용 시각을 갱신해 정리 시 오래 안 쓴 항목부터 지워지게 한다.
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def store(
+    key: str,
+    payload: dict[str, Any],
+    directory: Path = PARSE_CACHE_DIR,
+    max_bytes: int = PARSE_CACHE_MAX_BYTES,
+) -> None:
+    # 캐시는 보조 수단이므로 쓰기에 실패해도 업로드 처리는 계속한다.
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, ensure_ascii=False)
+            os.replace(tmp_name, _entry_path(key, directory))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        evict(directory, max_bytes)
+    except OSError:
+        return
+
+
+def evict(directory: Path = PARSE_CACHE_DIR, max_bytes: int = PARSE_CACHE_MAX_BYTES) -> int:
+    entries: list[tuple[float, int, Path]] = []
+    for path in directory.glob(f"*{SUFFIX}"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries, key=lambda item: item[0]):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def clear(directory: Path = PARSE_CACHE_DIR) -> None:
+    for path in directory.glob(f"*{SUFFIX}"):
+        path.unlink(missing_ok=True)
@@ -5,8 +5,9 @@ import sqlite3
 from datetime import datetime
 from typing import Any
 
+from .blocks import block_to_student_field, normalize_block
+from .cache import versioned
 from .constants import (
-    BLOCK_FIELD_MAP,
     PY_WEEKDAY_TO_KO,
     SPECIAL_LOCATION_HOMEROOM,
     SPECIAL_LOCATION_MOVE,
@@ -18,6 +19,7 @@ def get_today_weekday_ko() -> str:
     return PY_WEEKDAY_TO_KO.get(datetime.now().weekday(), "월")
 
 
+@versioned
 def list_classes(conn: sqlite3.Connection) -> list[int]:
     rows = conn.execute(
         "SELECT DISTINCT class_no FROM student_master WHERE class_no IS NOT NULL ORDER BY class_no"
@@ -25,6 +27,7 @@ def list_classes(conn: sqlite3.Connection) -> list[int]:
     return [int(row[0]) for row in rows]
 
 
+@versioned
 def list_student_numbers(conn: sqlite3.Connection, class_no: int | None) -> list[int]:
     if class_no is None:
         return []
@@ -40,6 +43,7 @@ def list_student_numbers(conn: sqlite3.Connection, class_no: int | None) -> list
     return [int(row[0]) for row in rows]
 
 
+@versioned
 def get_student_by_id(conn: sqlite3.Connection, student_id: str) -> sqlite3.Row | None:
     normalized = re.sub(r"\D", "", student_id)
     if not normalized:
@@ -47,6 +51,7 @@ def get_student_by_id(conn: sqlite3.Connection, student_id: str) -> sqlite3.Row
     return conn.execute("SELECT * FROM student_master WHERE student_id = ?", (normalized,)).fetchone()
 
 
+@versioned
 def get_student_by_class_number(
     conn: sqlite3.Connection, class_no: int, student_no: int
 ) -> sqlite3.Row | None:
@@ -56,7 +61,7 @@ def get_student_by_class_number(
     ).fetchone()
 
 
-def _extract_group_class_no_from_room(value: str | None) -> int | None:
+def extract_group_class_no_from_room(value: str | None) -> int | None:
     if not value:
         return None
     digits = re.sub(r"\D", "", str(value))
@@ -76,41 +81,14 @@ def _extract_group_class_no_from_room(value: str | None) -> int | None:
 
 
 def get_schedule_pattern_class_no(student: sqlite3.Row) -> int | None:
-    move_group_class_no = _extract_group_class_no_from_room(student["move_classroom"])
+    move_group_class_no = extract_group_class_no_from_room(student["move_classroom"])
     if move_group_class_no is not None:
         return move_group_class_no
     return int(student["class_no"]) if student["class_no"] is not None else None
 
 
-def _normalize_block(block_code: str | None) -> str:
-    return re.sub(r"\s+", "", str(block_code or ""))
-
-
-def _block_to_student_field(block_code: str | None) -> str | None:
-    key = _normalize_block(block_code)
-    if not key:
-        return None
-
-    if key.startswith("기초1"):
-        return "basic1_classroom"
-    if key.startswith("기초2"):
-        return "basic2_classroom"
-    if key.startswith("탐1") or key.startswith("탐구1"):
-        return "inquiry1_classroom"
-    if key.startswith("탐2") or key.startswith("탐구2"):
-        return "inquiry2_classroom"
-    if key.startswith("탐3") or key.startswith("탐구3"):
-        return "inquiry3_classroom"
-    if key.startswith("교양"):
-        return "liberal_classroom"
-    if key.startswith("이동반") or key.startswith("선택반"):
-        return "move_classroom"
-
-    return BLOCK_FIELD_MAP.get(key)
-
-
 def _should_follow_destination_for_subject(timetable_row: sqlite3.Row) -> bool:
-    block_key = _normalize_block(timetable_row["block_code"])
+    block_key = normalize_block(timetable_row["block_code"])
     if not block_key:
         return False
     if block_key == "공강":
@@ -119,7 +97,7 @@ def _should_follow_destination_for_subject(timetable_row: sqlite3.Row) -> bool:
 
     # These blocks depend on the student's assigned class, so subject/teacher must
     # be resolved from the destination class timetable (e.g., 탐1 = 4반).
-    if _block_to_student_field(block_key) is not None:
+    if block_to_student_field(block_key) is not None:
         return True
 
     # 동아리는 exception_location 으로 이동반을 가리키므로 별도 처리한다.
@@ -145,14 +123,14 @@ def _resolve_exception_location(token: str, student: sqlite3.Row) -> str:
     return token
 
 
-def _format_destination_display(value: str | None) -> str:
+def format_destination_display(value: str | None) -> str:
     text = str(value or "").strip()
     if not text:
         return ""
 
     # Stored classroom values like 801/401 should be shown as 8반/4반.
     if text.isdigit():
-        class_no = _extract_group_class_no_from_room(text)
+        class_no = extract_group_class_no_from_room(text)
         if class_no is not None:
             return f"{class_no}반"
 
@@ -165,7 +143,7 @@ def _resolve_destination_raw(student: sqlite3.Row, timetable_row: sqlite3.Row |
 
     # Keep explicit overrides so previously uploaded DB rows still render correctly
     # even if exception rules changed later.
-    block_key = _normalize_block(timetable_row["block_code"])
+    block_key = normalize_block(timetable_row["block_code"])
     if block_key == "진로2":
         return student["move_classroom"] or "이동반교실 미설정"
     if block_key == "공강":
@@ -174,7 +152,7 @@ def _resolve_destination_raw(student: sqlite3.Row, timetable_row: sqlite3.Row |
     if timetable_row["exception_location"]:
         return _resolve_exception_location(str(timetable_row["exception_location"]), student)
 
-    mapped_field = _block_to_student_field(timetable_row["block_code"])
+    mapped_field = block_to_student_field(timetable_row["block_code"])
     if mapped_field and student[mapped_field]:
         return str(student[mapped_field])
 
@@ -182,13 +160,27 @@ def _resolve_destination_raw(student: sqlite3.Row, timetable_row: sqlite3.Row |
 
 
 def resolve_destination(student: sqlite3.Row, timetable_row: sqlite3.Row | None) -> str:
-    if timetable_row is not None and _normalize_block(timetable_row["block_code"]) == "동아리":
+    if timetable_row is not None and normalize_block(timetable_row["block_code"]) == "동아리":
         return "본인선택반"
-    return _format_destination_display(_resolve_destination_raw(student, timetable_row))
+    return format_destination_display(_resolve_destination_raw(student, timetable_row))
+
+
+PatternKey = tuple[int, str, int]
+
+
+def _load_pattern_index(
+    conn: sqlite3.Connection, weekday: str | None = None
+) -> dict[PatternKey, sqlite3.Row]:
+    # 목적지 반 재조회가 교시마다 쿼리를 날리지 않도록 시간표를 한 번에 읽어 둔다.
+    if weekday is None:
+        rows = conn.execute("SELECT * FROM timetable_pattern").fetchall()
+    else:
+        rows = conn.execute("SELECT * FROM timetable_pattern WHERE weekday = ?", (weekday,)).fetchall()
+    return {(int(row["class_no"]), str(row["weekday"]), int(row["period"])): row for row in rows}
 
 
 def _resolve_subject_row_for_period(
-    conn: sqlite3.Connection,
+    pattern_index: dict[PatternKey, sqlite3.Row],
     student: sqlite3.Row,
     weekday: str,
     period: int,
@@ -202,19 +194,12 @@ def _resolve_subject_row_for_period(
         return base_class_no, base_row
 
     raw_destination = _resolve_destination_raw(student, base_row)
-    target_class_no = _extract_group_class_no_from_room(raw_destination)
+    target_class_no = extract_group_class_no_from_room(raw_destination)
 
     if target_class_no is None or target_class_no == base_class_no:
         return base_class_no, base_row
 
-    override_row = conn.execute(
-        """
-        SELECT *
-        FROM timetable_pattern
-        WHERE class_no = ? AND weekday = ? AND period = ?
-        """,
-        (target_class_no, weekday, period),
-    ).fetchone()
+    override_row = pattern_index.get((target_class_no, weekday, period))
     if override_row is None:
         return base_class_no, base_row
 
@@ -222,7 +207,10 @@ def _resolve_subject_row_for_period(
 
 
 def get_schedule_for_student(
-    conn: sqlite3.Connection, student: sqlite3.Row, weekday: str
+    conn: sqlite3.Connection,
+    student: sqlite3.Row,
+    weekday: str,
+    pattern_index: dict[PatternKey, sqlite3.Row] | None = None,
 ) -> list[dict[str, Any]]:
     if weekday not in WEEKDAYS:
         raise ValueError("요일은 월~금만 지원합니다.")
@@ -231,22 +219,14 @@ def get_schedule_for_student(
     if pattern_class_no is None:
         raise ValueError("학생의 시간표 기준 반(이동반/본반)을 결정할 수 없습니다.")
 
-    rows = conn.execute(
-        """
-        SELECT *
-        FROM timetable_pattern
-        WHERE class_no = ? AND weekday = ?
-        ORDER BY period
-        """,
-        (pattern_class_no, weekday),
-    ).fetchall()
-    by_period = {int(row["period"]): row for row in rows}
+    if pattern_index is None:
+        pattern_index = _load_pattern_index(conn, weekday)
 
     schedule: list[dict[str, Any]] = []
     for period in range(1, 8):
-        base_row = by_period.get(period)
+        base_row = pattern_index.get((pattern_class_no, weekday, period))
         effective_class_no, row = _resolve_subject_row_for_period(
-            conn=conn,
+            pattern_index=pattern_index,
             student=student,
             weekday=weekday,
             period=period,
@@ -264,6 +244,240 @@ def get_schedule_for_student(
     return schedule
 
 
+def _load_students(
+    conn: sqlite3.Connection,
+    student_ids: list[str] | None = None,
+    class_no: int | None = None,
+    grade: int | None = None,
+) -> list[sqlite3.Row]:
+    order_by = "ORDER BY class_no, student_no, student_id"
+    if student_ids is not None:
+        normalized = [re.sub(r"\D", "", str(value)) for value in student_ids]
+        normalized = list(dict.fromkeys(value for value in normalized if value))
+        rows: list[sqlite3.Row] = []
+        # SQLite 바인딩 변수 개수 제한을 넘지 않도록 나눠서 조회한다.
+        for i in range(0, len(normalized), 500):
+            chunk = normalized[i : i + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows.extend(
+                conn.execute(
+                    f"SELECT * FROM student_master WHERE student_id IN ({placeholders}) {order_by}",
+                    chunk,
+                ).fetchall()
+            )
+        return rows
+    if class_no is not None:
+        return conn.execute(f"SELECT * FROM student_master WHERE class_no = ? {order_by}", (class_no,)).fetchall()
+    if grade is not None:
+        # 학번은 [학년][반 2자리][번호 2자리] 형식이다.
+        prefix = str(grade)
+        return conn.execute(
+            f"SELECT * FROM student_master WHERE student_id LIKE ? AND length(student_id) = ? {order_by}",
+            (f"{prefix}%", len(prefix) + 4),
+        ).fetchall()
+    return conn.execute(f"SELECT * FROM student_master {order_by}").fetchall()
+
+
+def get_weekly_schedules_for_students(
+    conn: sqlite3.Connection,
+    student_ids: list[str] | None = None,
+    *,
+    class_no: int | None = None,
+    grade: int | None = None,
+) -> dict[str, dict[str, list[dict[str, Any]]]]:
+    # 담임 일괄 출력용: 미리 계산된 resolved_schedule 을 학생 묶음 단위로 한 번에 읽는다.
+    # 시간표 기준 반을 정할 수 없는 학생은 결과에서 제외된다.
+    students = [
+        student
+        for student in _load_students(conn, student_ids=student_ids, class_no=class_no, grade=grade)
+        if get_schedule_pattern_class_no(student) is not None
+    ]
+    resolved: dict[tuple[str, str], list[dict[str, Any]]] = {}
+    ids = [str(student["student_id"]) for student in students]
+    # SQLite 바인딩 변수 개수 제한을 넘지 않도록 나눠서 조회한다.
+    for i in range(0, len(ids), 500):
+        chunk = ids[i : i + 500]
+        placeholders = ", ".join("?" for _ in chunk)
+        for row in conn.execute(
+            f"SELECT * FROM resolved_schedule WHERE student_id IN ({placeholders}) ORDER BY student_id, weekday, period",
+            chunk,
+        ):
+            resolved.setdefault((str(row["student_id"]), row["weekday"]), []).append(_resolved_row_to_item(row))
+
+    pattern_index: dict[PatternKey, sqlite3.Row] | None = None
+    result: dict[str, dict[str, list[dict[str, Any]]]] = {}
+    for student in students:
+        student_id = str(student["student_id"])
+        weekly: dict[str, list[dict[str, Any]]] = {}
+        for weekday in WEEKDAYS:
+            items = resolved.get((student_id, weekday))
+            if items is None:
+                # get_resolved_schedule 과 같이 계산되지 않은 학생/요일만 즉시 계산한다.
+                if pattern_index is None:
+                    pattern_index = _load_pattern_index(conn)
+                items = get_schedule_for_student(conn, student, weekday, pattern_index=pattern_index)
+            weekly[weekday] = items
+        result[student_id] = weekly
+    return result
+
+
+_ROOM_PLACEHOLDERS = {"이동반교실 미설정", "본반"}
+
+
+def room_from_destination(raw_destination: str) -> str | None:
+    text = str(raw_destination).strip()
+    if not text or text in _ROOM_PLACEHOLDERS:
+        return None
+    return text
+
+
+def get_resolved_schedule(
+    conn: sqlite3.Connection, student: sqlite3.Row, weekday: str
+) -> list[dict[str, Any]]:
+    if weekday not in WEEKDAYS:
+        raise ValueError("요일은 월~금만 지원합니다.")
+
+    rows = conn.execute(
+        """
+        SELECT *
+        FROM resolved_schedule
+        WHERE student_id = ? AND weekday = ?
+        ORDER BY period
+        """,
+        (student["student_id"], weekday),
+    ).fetchall()
+    if not rows:
+        # 아직 계산되지 않은 DB(이전 버전에서 업로드된 데이터)는 즉시 계산한다.
+        return get_schedule_for_student(conn, student, weekday)
+
+    return [_resolved_row_to_item(row) for row in rows]
+
+
+def _resolved_row_to_item(row: sqlite3.Row) -> dict[str, Any]:
+    return {
+        "교시": int(row["period"]),
+        "기준반": row["basis_class_no"],
+        "수업블록": row["block_code"],
+        "과목명(교사)": row["subject_teacher"],
+        "이동할 장소📍": row["destination"],
+    }
+
+
+@versioned
+def get_weekly_schedule(
+    conn: sqlite3.Connection, student: sqlite3.Row
+) -> list[list[dict[str, Any] | None]]:
+    # 인쇄 미리보기용 교시 x 요일 격자. grid[교시 - 1][WEEKDAYS 인덱스] 로 바로 접근한다.
+    grid: list[list[dict[str, Any] | None]] = [[None] * len(WEEKDAYS) for _ in range(7)]
+    day_index = {weekday: idx for idx, weekday in enumerate(WEEKDAYS)}
+
+    rows = conn.execute(
+        "SELECT * FROM resolved_schedule WHERE student_id = ?",
+        (student["student_id"],),
+    ).fetchall()
+    if rows:
+        for row in rows:
+            period = int(row["period"])
+            if 1 <= period <= 7 and row["weekday"] in day_index:
+                grid[period - 1][day_index[row["weekday"]]] = _resolved_row_to_item(row)
+        return grid
+
+    pattern_index = _load_pattern_index(conn)
+    for weekday, col in day_index.items():
+        for item in get_schedule_for_student(conn, student, weekday, pattern_index=pattern_index):
+            grid[int(item["교시"]) - 1][col] = item
+    return grid
+
+
+def list_students_in_room(
+    conn: sqlite3.Connection, weekday: str, period: int, room: str
+) -> list[sqlite3.Row]:
+    return conn.execute(
+        """
+        SELECT sm.*
+        FROM resolved_schedule AS rs
+        JOIN student_master AS sm ON sm.student_id = rs.student_id
+        WHERE rs.weekday = ? AND rs.period = ? AND rs.room = ?
+        ORDER BY sm.class_no, sm.student_no, sm.student_id
+        """,
+        (weekday, period, str(room).strip()),
+    ).fetchall()
+
+
+@versioned
+def get_room_headcounts(conn: sqlite3.Connection, weekday: str, period: int) -> list[dict[str, Any]]:
+    rows = conn.execute(
+        """
+        SELECT room, COUNT(*) AS headcount
+        FROM resolved_schedule
+        WHERE weekday = ? AND period = ? AND room IS NOT NULL
+        GROUP BY room
+        ORDER BY headcount DESC, room
+        """,
+        (weekday, period),
+    ).fetchall()
+    return [{"장소": row["room"], "인원": int(row["headcount"])} for row in rows]
+
+
+@versioned
+def list_teachers(conn: sqlite3.Connection) -> list[str]:
+    rows = conn.execute(
+        """
+        SELECT DISTINCT teacher_name
+        FROM resolved_schedule
+        WHERE teacher_name IS NOT NULL AND teacher_name <> ''
+        ORDER BY teacher_name
+        """
+    ).fetchall()
+    return [str(row[0]) for row in rows]
+
+
+def get_teacher_timetable(conn: sqlite3.Connection, teacher_name: str) -> list[dict[str, Any]]:
+    rows = conn.execute(
+        """
+        SELECT weekday, period, basis_class_no, room, COUNT(*) AS headcount
+        FROM resolved_schedule
+        WHERE teacher_name = ?
+        GROUP BY weekday, period, basis_class_no, room
+        """,
+        (teacher_name,),
+    ).fetchall()
+    day_order = {weekday: idx for idx, weekday in enumerate(WEEKDAYS)}
+    rows = sorted(
+        rows,
+        key=lambda row: (
+            day_order.get(row["weekday"], len(WEEKDAYS)),
+            row["period"],
+            row["basis_class_no"] or 0,
+        ),
+    )
+    return [
+        {
+            "요일": row["weekday"],
+            "교시": int(row["period"]),
+            "기준반": row["basis_class_no"],
+            "장소": row["room"] or "-",
+            "인원": int(row["headcount"]),
+        }
+        for row in rows
+    ]
+
+
+def get_teacher_roster(
+    conn: sqlite3.Connection, teacher_name: str, weekday: str, period: int
+) -> list[sqlite3.Row]:
+    return conn.execute(
+        """
+        SELECT sm.*
+        FROM resolved_schedule AS rs
+        JOIN student_master AS sm ON sm.student_id = rs.student_id
+        WHERE rs.teacher_name = ? AND rs.weekday = ? AND rs.period = ?
+        ORDER BY sm.class_no, sm.student_no, sm.student_id
+        """,
+        (teacher_name, weekday, period),
+    ).fetchall()
+
+
 def summarize_student(row: sqlite3.Row) -> dict[str, Any]:
     return {
         "학번": row["student_id"],
@@ -1,17 +1,50 @@
 from __future__ import annotations
 
+import json
 import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Any, Mapping, Sequence
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterable, Iterator, Mapping, Sequence
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from . import database
+from .constants import DATASET_FINGERPRINT_KEY, LAST_UPDATED_AT_KEY, SYNC_WATERMARK_KEYS
 
 DEFAULT_SUPABASE_URL = "https://bcwubnsoyqsftuetbnit.supabase.co"
 TABLE_STUDENT = "student_master"
 TABLE_TIMETABLE = "timetable_pattern"
 TABLE_META = "app_meta"
+# updated_at 이 있어 증분 동기화하는 테이블. app_meta 는 작아서 매번 전부 받는다.
+SYNC_TABLES = (TABLE_STUDENT, TABLE_TIMETABLE)
+# 페이지 정렬과 upsert 충돌 판정에 쓰는 기본 키.
+TABLE_KEYS = {
+    TABLE_STUDENT: "student_id",
+    TABLE_TIMETABLE: "class_no,weekday,period",
+    TABLE_META: "meta_key",
+}
+PAGE_SIZE = 1000
+FETCH_WORKERS = 4
+INSERT_WORKERS = 4
+INSERT_CHUNK_ROWS = 500
+INSERT_CHUNK_BYTES = 512 * 1024
+MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+RETRY_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+# 키 목록이 URL 에 들어가므로 삭제 요청 하나에 담는 키 수를 제한한다.
+DELETE_CHUNK_KEYS = 100
+SYNC_INTERVAL_SECONDS = 60.0
+# 업로드 묶음은 각자 트랜잭션이라 늦게 시작한 묶음이 먼저 커밋될 수 있다. 기준점보다 이만큼 앞에서부터 다시 읽는다.
+WATERMARK_LOOKBACK_SECONDS = 300
+_CONTENT_RANGE_RE = re.compile(r"^\s*(?:\*|\d+-\d+)/(\d+|\*)\s*$")
 
 
 @dataclass(frozen=True)
@@ -93,8 +126,57 @@ def _table_url(settings: SupabaseSettings, table_name: str) -> str:
     return f"{settings.base_url}/rest/v1/{table_name}"
 
 
-def _chunks(rows: Sequence[Mapping[str, Any]], chunk_size: int = 500) -> list[Sequence[Mapping[str, Any]]]:
-    return [rows[i : i + chunk_size] for i in range(0, len(rows), chunk_size)]
+def _new_session(pool_size: int = FETCH_WORKERS) -> requests.Session:
+    session = requests.Session()
+    # 여러 요청을 동시에 보낼 때 연결을 재사용하도록 풀 크기를 작업 수에 맞춘다.
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _chunks(
+    rows: Sequence[Mapping[str, Any]],
+    chunk_size: int = INSERT_CHUNK_ROWS,
+    max_bytes: int = INSERT_CHUNK_BYTES,
+) -> list[Sequence[Mapping[str, Any]]]:
+    # 행 수와 직렬화 크기 중 먼저 닿는 한도에서 자른다. 긴 문자열이 많은 표도 요청 하나가 너무 커지지 않는다.
+    chunks: list[Sequence[Mapping[str, Any]]] = []
+    start = 0
+    size = 0
+    for index, row in enumerate(rows):
+        row_bytes = len(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8")) + 1
+        if index > start and (index - start >= chunk_size or size + row_bytes > max_bytes):
+            chunks.append(rows[start:index])
+            start = index
+            size = 0
+        size += row_bytes
+    if start < len(rows):
+        chunks.append(rows[start:])
+    return chunks
+
+
+def _retry_delay(attempt: int, resp: requests.Response | None) -> float:
+    retry_after = resp.headers.get("Retry-After", "") if resp is not None else ""
+    if retry_after.strip().isdigit():
+        return min(float(retry_after), BACKOFF_MAX_SECONDS)
+    # 여러 작업이 동시에 재시도하며 몰리지 않도록 지연에 흔들림을 준다.
+    return min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2**attempt) * random.uniform(0.5, 1.0)
+
+
+def _request(session: requests.Session, method: str, url: str, **kwargs: Any) -> requests.Response:
+    # 429/5xx 와 연결 오류는 일시적인 것으로 보고 지수적으로 늘어나는 간격으로 다시 보낸다.
+    for attempt in range(MAX_RETRIES):
+        resp: requests.Response | None = None
+        try:
+            resp = session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            pass
+        else:
+            if resp.status_code not in RETRY_STATUS_CODES:
+                return resp
+        time.sleep(_retry_delay(attempt, resp))
+    return session.request(method, url, **kwargs)
 
 
 def _delete_all_rows(
@@ -104,7 +186,9 @@ def _delete_all_rows(
     table_name: str,
     not_null_filter_column: str,
 ) -> None:
-    resp = session.delete(
+    resp = _request(
+        session,
+        "DELETE",
         _table_url(settings, table_name),
         headers=_headers(settings),
         params={not_null_filter_column: "not.is.null"},
@@ -114,39 +198,109 @@ def _delete_all_rows(
         raise RuntimeError(f"Failed to clear '{table_name}': {resp.status_code} {resp.text}")
 
 
+def _post_chunk(
+    session: requests.Session,
+    *,
+    settings: SupabaseSettings,
+    table_name: str,
+    chunk: Sequence[Mapping[str, Any]],
+) -> None:
+    # 기본 키 기준 병합(upsert)으로 보내므로, 응답을 못 받고 다시 보낸 묶음도 중복 없이 같은 결과가 된다.
+    resp = _request(
+        session,
+        "POST",
+        _table_url(settings, table_name),
+        headers={**_headers(settings, json_body=True), "Prefer": "resolution=merge-duplicates,return=minimal"},
+        params={"on_conflict": TABLE_KEYS[table_name]},
+        json=list(chunk),
+        timeout=60,
+    )
+    if resp.status_code == 413 and len(chunk) > 1:
+        # 요청이 너무 크면 반으로 나눠 다시 보낸다.
+        middle = len(chunk) // 2
+        _post_chunk(session, settings=settings, table_name=table_name, chunk=chunk[:middle])
+        _post_chunk(session, settings=settings, table_name=table_name, chunk=chunk[middle:])
+        return
+    if resp.status_code not in (200, 201, 204):
+        raise RuntimeError(f"Failed to insert into '{table_name}': {resp.status_code} {resp.text}")
+
+
 def _insert_rows(
     session: requests.Session,
     *,
     settings: SupabaseSettings,
     table_name: str,
     rows: Sequence[Mapping[str, Any]],
+    workers: int = INSERT_WORKERS,
 ) -> None:
-    if not rows:
+    chunks = _chunks(rows)
+    if not chunks:
         return
-    for chunk in _chunks(rows, chunk_size=500):
-        resp = session.post(
-            _table_url(settings, table_name),
-            headers={**_headers(settings, json_body=True), "Prefer": "return=minimal"},
-            json=list(chunk),
-            timeout=60,
-        )
-        if resp.status_code not in (200, 201, 204):
-            raise RuntimeError(f"Failed to insert into '{table_name}': {resp.status_code} {resp.text}")
+    if len(chunks) == 1:
+        _post_chunk(session, settings=settings, table_name=table_name, chunk=chunks[0])
+        return
+
+    # 묶음은 서로 독립이므로 동시에 보내 왕복 횟수 대신 대역폭이 시간을 좌우하게 한다.
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as executor:
+        futures = [
+            executor.submit(_post_chunk, session, settings=settings, table_name=table_name, chunk=chunk)
+            for chunk in chunks
+        ]
+        try:
+            for future in as_completed(futures):
+                future.result()
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+
+def _count_rows(
+    session: requests.Session,
+    *,
+    settings: SupabaseSettings,
+    table_name: str,
+    filters: Mapping[str, str] | None = None,
+) -> int | None:
+    resp = _request(
+        session,
+        "GET",
+        _table_url(settings, table_name),
+        headers={**_headers(settings), "Prefer": "count=exact", "Range-Unit": "items", "Range": "0-0"},
+        params={**(filters or {}), "select": TABLE_KEYS[table_name]},
+        timeout=40,
+    )
+    if resp.status_code == 416:
+        return 0
+    if resp.status_code not in (200, 206):
+        raise RuntimeError(f"Failed to count '{table_name}': {resp.status_code} {resp.text}")
+    match = _CONTENT_RANGE_RE.match(resp.headers.get("Content-Range", ""))
+    if match is None or match.group(1) == "*":
+        return None
+    return int(match.group(1))
 
 
-def _fetch_all_rows(
+def _fetch_range(
     session: requests.Session,
     *,
     settings: SupabaseSettings,
     table_name: str,
+    offset: int,
+    limit: int,
+    filters: Mapping[str, str] | None = None,
+    select: str = "*",
 ) -> list[dict[str, Any]]:
-    resp = session.get(
+    resp = _request(
+        session,
+        "GET",
         _table_url(settings, table_name),
-        headers=_headers(settings),
-        params={"select": "*"},
+        headers={**_headers(settings), "Range-Unit": "items", "Range": f"{offset}-{offset + limit - 1}"},
+        params={**(filters or {}), "select": select, "order": TABLE_KEYS[table_name]},
         timeout=40,
     )
-    if resp.status_code != 200:
+    if resp.status_code == 416:
+        return []
+    if resp.status_code not in (200, 206):
         raise RuntimeError(f"Failed to fetch '{table_name}': {resp.status_code} {resp.text}")
 
     payload = resp.json()
@@ -155,48 +309,186 @@ def _fetch_all_rows(
     return [row for row in payload if isinstance(row, dict)]
 
 
-def replace_all_data(
+def _fetch_page(
+    session: requests.Session,
     *,
-    student_rows: Sequence[Mapping[str, Any]],
-    timetable_rows: Sequence[Mapping[str, Any]],
-    last_updated_at: str,
-    secrets: Mapping[str, Any] | None = None,
-) -> None:
-    settings = _resolve_required_settings(secrets=secrets)
-
-    with requests.Session() as session:
-        _delete_all_rows(
+    settings: SupabaseSettings,
+    table_name: str,
+    offset: int,
+    limit: int,
+    filters: Mapping[str, str] | None = None,
+    select: str = "*",
+) -> list[dict[str, Any]]:
+    # 서버의 max-rows 가 페이지 크기보다 작으면 응답이 잘리므로 남은 구간을 이어서 받는다.
+    rows: list[dict[str, Any]] = []
+    while len(rows) < limit:
+        chunk = _fetch_range(
             session,
             settings=settings,
-            table_name=TABLE_STUDENT,
-            not_null_filter_column="student_id",
+            table_name=table_name,
+            offset=offset + len(rows),
+            limit=limit - len(rows),
+            filters=filters,
+            select=select,
         )
-        _delete_all_rows(
+        if not chunk:
+            break
+        rows.extend(chunk)
+    return rows
+
+
+def _iter_pages(
+    session: requests.Session,
+    *,
+    settings: SupabaseSettings,
+    table_name: str,
+    filters: Mapping[str, str] | None = None,
+    select: str = "*",
+    page_size: int = PAGE_SIZE,
+    workers: int = FETCH_WORKERS,
+) -> Iterator[list[dict[str, Any]]]:
+    # 전체 건수를 먼저 확인한 뒤 페이지를 동시에 요청하고, 도착하는 순서대로 넘겨준다.
+    total = _count_rows(session, settings=settings, table_name=table_name, filters=filters) or 0
+    offsets = range(0, total, page_size)
+    if offsets:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(offsets)))) as executor:
+            futures = [
+                executor.submit(
+                    _fetch_page,
+                    session,
+                    settings=settings,
+                    table_name=table_name,
+                    offset=offset,
+                    limit=min(page_size, total - offset),
+                    filters=filters,
+                    select=select,
+                )
+                for offset in offsets
+            ]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    # 건수를 센 뒤에 추가된 행이나 건수를 알려주지 않는 서버에 대비해 끝에서부터 더 없을 때까지 받는다.
+    offset = total
+    while True:
+        page = _fetch_range(
             session,
             settings=settings,
-            table_name=TABLE_TIMETABLE,
-            not_null_filter_column="class_no",
+            table_name=table_name,
+            offset=offset,
+            limit=page_size,
+            filters=filters,
+            select=select,
         )
-        _delete_all_rows(
+        if not page:
+            break
+        yield page
+        offset += len(page)
+
+
+def _fetch_all_rows(
+    session: requests.Session,
+    *,
+    settings: SupabaseSettings,
+    table_name: str,
+    filters: Mapping[str, str] | None = None,
+    select: str = "*",
+) -> list[dict[str, Any]]:
+    pages = _iter_pages(session, settings=settings, table_name=table_name, filters=filters, select=select)
+    return [row for page in pages for row in page]
+
+
+def _row_key(row: Mapping[str, Any], table_name: str) -> tuple[str, ...]:
+    # 로컬 행(int)과 원격 JSON 값을 같은 기준으로 비교하도록 문자열로 맞춘다.
+    return tuple(str(row.get(column)) for column in TABLE_KEYS[table_name].split(","))
+
+
+def _quote_filter_value(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _delete_keys(
+    session: requests.Session,
+    *,
+    settings: SupabaseSettings,
+    table_name: str,
+    keys: Sequence[tuple[str, ...]],
+) -> None:
+    columns = TABLE_KEYS[table_name].split(",")
+    for start in range(0, len(keys), DELETE_CHUNK_KEYS):
+        chunk = keys[start : start + DELETE_CHUNK_KEYS]
+        if len(columns) == 1:
+            params = {columns[0]: f"in.({','.join(_quote_filter_value(key[0]) for key in chunk)})"}
+        else:
+            conditions = [
+                ",".join(f"{column}.eq.{_quote_filter_value(value)}" for column, value in zip(columns, key))
+                for key in chunk
+            ]
+            params = {"or": f"({','.join(f'and({condition})' for condition in conditions)})"}
+        resp = _request(
             session,
-            settings=settings,
-            table_name=TABLE_META,
-            not_null_filter_column="meta_key",
+            "DELETE",
+            _table_url(settings, table_name),
+            headers=_headers(settings),
+            params=params,
+            timeout=40,
         )
+        if resp.status_code not in (200, 204):
+            raise RuntimeError(f"Failed to delete from '{table_name}': {resp.status_code} {resp.text}")
 
-        _insert_rows(session, settings=settings, table_name=TABLE_STUDENT, rows=student_rows)
-        _insert_rows(session, settings=settings, table_name=TABLE_TIMETABLE, rows=timetable_rows)
-        _insert_rows(
+
+def _replace_table_rows(
+    session: requests.Session,
+    *,
+    settings: SupabaseSettings,
+    table_name: str,
+    rows: Sequence[Mapping[str, Any]],
+) -> None:
+    # 먼저 upsert 로 새 값을 덮어쓰고, 그 뒤 새 데이터에 없는 키만 골라 지운다.
+    # 전체 삭제 후 다시 넣지 않으므로 교체 중에도 원격 테이블이 비어 보이지 않는다.
+    existing = {
+        _row_key(row, table_name)
+        for row in _fetch_all_rows(session, settings=settings, table_name=table_name, select=TABLE_KEYS[table_name])
+    }
+    _insert_rows(session, settings=settings, table_name=table_name, rows=rows)
+    vanished = sorted(existing - {_row_key(row, table_name) for row in rows})
+    _delete_keys(session, settings=settings, table_name=table_name, keys=vanished)
+
+
+def replace_all_data(
+    *,
+    student_rows: Sequence[Mapping[str, Any]],
+    timetable_rows: Sequence[Mapping[str, Any]],
+    last_updated_at: str,
+    secrets: Mapping[str, Any] | None = None,
+) -> None:
+    settings = _resolve_required_settings(secrets=secrets)
+
+    with _new_session(INSERT_WORKERS) as session:
+        _replace_table_rows(session, settings=settings, table_name=TABLE_STUDENT, rows=student_rows)
+        _replace_table_rows(session, settings=settings, table_name=TABLE_TIMETABLE, rows=timetable_rows)
+        # 메타는 마지막에 바꿔 다른 인스턴스가 갱신 시각/지문을 보았을 때 데이터도 이미 반영되어 있게 한다.
+        _replace_table_rows(
             session,
             settings=settings,
             table_name=TABLE_META,
-            rows=[{"meta_key": "last_updated_at", "meta_value": last_updated_at}],
+            rows=[
+                {"meta_key": LAST_UPDATED_AT_KEY, "meta_value": last_updated_at},
+                {
+                    "meta_key": DATASET_FINGERPRINT_KEY,
+                    "meta_value": database.compute_dataset_fingerprint(student_rows, timetable_rows),
+                },
+            ],
         )
 
 
 def clear_all_data(*, secrets: Mapping[str, Any] | None = None) -> None:
     settings = _resolve_required_settings(secrets=secrets)
-    with requests.Session() as session:
+    with _new_session(INSERT_WORKERS) as session:
         _delete_all_rows(
             session,
             settings=settings,
@@ -217,6 +509,119 @@ def clear_all_data(*, secrets: Mapping[str, Any] | None = None) -> None:
         )
 
 
+def _latest_updated_at(rows: Sequence[Mapping[str, Any]], current: str | None) -> str | None:
+    # PostgREST 는 timestamptz 를 같은 시간대의 ISO 문자열로 주므로 문자열 비교로 최댓값을 고른다.
+    values = [str(row["updated_at"]) for row in rows if row.get("updated_at")]
+    if current:
+        values.append(current)
+    return max(values, default=None)
+
+
+def _watermark_floor(watermark: str) -> str:
+    try:
+        moment = datetime.fromisoformat(watermark)
+    except ValueError:
+        return watermark
+    return (moment - timedelta(seconds=WATERMARK_LOOKBACK_SECONDS)).isoformat()
+
+
+def _store_watermarks(conn: sqlite3.Connection, watermarks: Mapping[str, str | None]) -> None:
+    for table_name, watermark in watermarks.items():
+        if watermark:
+            database.set_meta(conn, SYNC_WATERMARK_KEYS[table_name], watermark, bump_version=False)
+
+
+def _meta_values(meta_rows: Sequence[Mapping[str, Any]]) -> dict[str, str]:
+    meta_values: dict[str, str] = {}
+    for row in meta_rows:
+        key = str(row.get("meta_key") or "").strip()
+        if not key:
+            continue
+        meta_values[key] = str(row.get("meta_value") or "")
+    return meta_values
+
+
+def _fetch_latest_updated_at(
+    session: requests.Session,
+    *,
+    settings: SupabaseSettings,
+    table_name: str,
+) -> str | None:
+    resp = _request(
+        session,
+        "GET",
+        _table_url(settings, table_name),
+        headers=_headers(settings),
+        params={"select": "updated_at", "order": "updated_at.desc.nullslast", "limit": "1"},
+        timeout=40,
+    )
+    if resp.status_code not in (200, 206):
+        raise RuntimeError(f"Failed to fetch latest updated_at of '{table_name}': {resp.status_code} {resp.text}")
+    payload = resp.json()
+    if not isinstance(payload, list):
+        raise RuntimeError(f"Unexpected response for '{table_name}'.")
+    return _latest_updated_at([row for row in payload if isinstance(row, dict)], None)
+
+
+def _fetch_meta_rows(session: requests.Session, *, settings: SupabaseSettings) -> list[dict[str, Any]]:
+    # app_meta 는 몇 행뿐이므로 요청 한 번으로 받는다.
+    return _fetch_range(session, settings=settings, table_name=TABLE_META, offset=0, limit=PAGE_SIZE)
+
+
+def _needs_full_sync(
+    pool: database.ConnectionPool,
+    session: requests.Session,
+    *,
+    settings: SupabaseSettings,
+    remote_fingerprint: str | None,
+) -> bool:
+    remote_counts = {
+        table_name: _count_rows(session, settings=settings, table_name=table_name) for table_name in SYNC_TABLES
+    }
+    with pool.reader() as conn:
+        # 원격 지문은 업로드가 끝날 때 마지막으로 바뀐다. 지난 주기 이후 새 지문이 보이면 내용 전체가 같은지 확인한다.
+        # (지난번에 본 지문은 sync_meta 로 로컬 app_meta 에 남아 있다.)
+        if remote_fingerprint and remote_fingerprint != database.get_meta(conn, DATASET_FINGERPRINT_KEY):
+            if remote_fingerprint != database.local_dataset_fingerprint(conn):
+                return True
+        stats = database.get_stats(conn)
+    # 원격에서 지워진 행은 updated_at 으로 알 수 없으므로 건수가 어긋나면 전체 비교로 맞춘다.
+    local_counts = {TABLE_STUDENT: stats["student_count"], TABLE_TIMETABLE: stats["timetable_count"]}
+    return any(
+        remote_count is not None and remote_count != local_counts[table_name]
+        for table_name, remote_count in remote_counts.items()
+    )
+
+
+def _iter_table_pages(
+    session: requests.Session,
+    *,
+    settings: SupabaseSettings,
+) -> Iterator[tuple[str, list[dict[str, Any]]]]:
+    for table_name in SYNC_TABLES:
+        for page in _iter_pages(session, settings=settings, table_name=table_name):
+            yield table_name, page
+
+
+def _apply_full_pages(
+    conn: sqlite3.Connection,
+    pages: Iterable[tuple[str, list[dict[str, Any]]]],
+) -> dict[str, database.SyncCounts]:
+    # 받은 페이지는 바로 *_next 테이블에 쌓고, 다 받은 뒤 원격과 다른 행만 운영 테이블에 반영한다.
+    # 원격에 없는 행은 지워진다.
+    watermarks: dict[str, str | None] = dict.fromkeys(SYNC_TABLES)
+    database.begin_snapshot(conn, SYNC_TABLES)
+    try:
+        for table_name, page in pages:
+            database.write_snapshot_rows(conn, table_name, page, replace=True)
+            watermarks[table_name] = _latest_updated_at(page, watermarks[table_name])
+        counts = {table_name: database.merge_snapshot_table(conn, table_name) for table_name in SYNC_TABLES}
+    finally:
+        database.discard_snapshot(conn, SYNC_TABLES)
+    _store_watermarks(conn, watermarks)
+    return counts
+
+
 def sync_sqlite_from_supabase(
     conn,
     *,
@@ -226,22 +631,118 @@ def sync_sqlite_from_supabase(
     if settings is None:
         return False
 
-    with requests.Session() as session:
-        student_rows = _fetch_all_rows(session, settings=settings, table_name=TABLE_STUDENT)
-        timetable_rows = _fetch_all_rows(session, settings=settings, table_name=TABLE_TIMETABLE)
+    with _new_session() as session:
+        # 원격 지문이 로컬 데이터와 같으면 대량 전송을 건너뛴다.
+        meta_rows = _fetch_meta_rows(session, settings=settings)
+        remote_fingerprint = _meta_values(meta_rows).get(DATASET_FINGERPRINT_KEY)
+        if remote_fingerprint and remote_fingerprint == database.local_dataset_fingerprint(conn):
+            # 초기화 등으로 기준점이 없으면 첫 증분 동기화가 전체를 다시 받으므로, 원격 최신 updated_at 으로 채워 둔다.
+            missing = [
+                table_name
+                for table_name in SYNC_TABLES
+                if not database.get_meta(conn, SYNC_WATERMARK_KEYS[table_name])
+            ]
+            _store_watermarks(
+                conn,
+                {
+                    table_name: _fetch_latest_updated_at(session, settings=settings, table_name=table_name)
+                    for table_name in missing
+                },
+            )
+            database.sync_meta(conn, _meta_values(meta_rows))
+            return True
+        counts = _apply_full_pages(conn, _iter_table_pages(session, settings=settings))
         meta_rows = _fetch_all_rows(session, settings=settings, table_name=TABLE_META)
+    database.sync_meta(conn, _meta_values(meta_rows))
 
-    database.clear_all_data(conn)
+    fetched = sum(item.inserted + item.updated + item.unchanged for item in counts.values())
+    return bool(fetched or meta_rows)
 
-    if student_rows:
-        database.replace_student_master(conn, student_rows)
-    if timetable_rows:
-        database.replace_timetable_patterns(conn, timetable_rows)
-    for row in meta_rows:
-        key = str(row.get("meta_key") or "").strip()
-        if not key:
-            continue
-        value = str(row.get("meta_value") or "")
-        database.set_meta(conn, key, value)
 
-    return bool(student_rows or timetable_rows or meta_rows)
+def sync_sqlite_incremental(
+    pool: database.ConnectionPool,
+    *,
+    secrets: Mapping[str, Any] | None = None,
+) -> bool:
+    # 지난 동기화 이후 원격 updated_at 이 바뀐 행만 받아 upsert 한다. 학생/시간표 행이 바뀌었으면 True.
+    # 네트워크 요청은 쓰기 잠금 밖에서 하고, 받은 행을 반영할 때만 pool.writer() 를 잡는다.
+    settings = _resolve_settings(secrets=secrets)
+    if settings is None:
+        return False
+
+    with pool.reader() as conn:
+        watermarks = {
+            table_name: database.get_meta(conn, SYNC_WATERMARK_KEYS[table_name]) for table_name in SYNC_TABLES
+        }
+    changed = False
+    with _new_session() as session:
+        meta_rows = _fetch_meta_rows(session, settings=settings)
+        remote_fingerprint = _meta_values(meta_rows).get(DATASET_FINGERPRINT_KEY)
+        full_sync = not all(watermarks.values())
+        if not full_sync:
+            # 기준점 근처에서 늦게 커밋된 행을 놓치지 않도록 조금 앞에서부터 다시 읽는다.
+            # 이미 받은 행이 다시 와도 값이 같으면 upsert 에서 건너뛴다.
+            updates = {
+                table_name: _fetch_all_rows(
+                    session,
+                    settings=settings,
+                    table_name=table_name,
+                    filters={"updated_at": f"gte.{_watermark_floor(watermarks[table_name])}"},
+                )
+                for table_name in SYNC_TABLES
+            }
+            with pool.writer() as conn:
+                for table_name, rows in updates.items():
+                    if not rows:
+                        continue
+                    changed |= database.upsert_table_rows(conn, table_name, rows).changed
+                    _store_watermarks(conn, {table_name: _latest_updated_at(rows, watermarks[table_name])})
+            full_sync = _needs_full_sync(pool, session, settings=settings, remote_fingerprint=remote_fingerprint)
+        if full_sync:
+            # 기준점이 없거나(첫 동기화) 증분으로 맞춰지지 않으면(삭제, 놓친 변경) 전체를 받아 비교한다.
+            pages = list(_iter_table_pages(session, settings=settings))
+            with pool.writer() as conn:
+                counts = _apply_full_pages(conn, pages)
+            changed |= any(item.changed for item in counts.values())
+    with pool.writer() as conn:
+        database.sync_meta(conn, _meta_values(meta_rows))
+    return changed
+
+
+@dataclass
+class BackgroundSync:
+    thread: threading.Thread
+    stop_event: threading.Event
+    last_error: str | None = None
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+
+def start_background_sync(
+    pool: database.ConnectionPool,
+    *,
+    secrets: Mapping[str, Any] | None = None,
+    interval: float = SYNC_INTERVAL_SECONDS,
+    on_change: Callable[[sqlite3.Connection], object] | None = None,
+) -> BackgroundSync:
+    # 다른 인스턴스에서 올린 데이터를 재시작 없이 받아오도록 주기적으로 증분 동기화한다.
+    stop_event = threading.Event()
+
+    def run() -> None:
+        while not stop_event.wait(interval):
+            try:
+                if sync_sqlite_incremental(pool, secrets=secrets) and on_change is not None:
+                    with pool.writer() as conn:
+                        on_change(conn)
+                sync.last_error = None
+            except Exception as exc:  # noqa: BLE001
+                # 네트워크 오류 등은 기록만 하고 다음 주기에 다시 시도한다.
+                sync.last_error = str(exc)
+
+    sync = BackgroundSync(
+        thread=threading.Thread(target=run, name="supabase-sync", daemon=True),
+        stop_event=stop_event,
+    )
+    sync.thread.start()
+    return sync
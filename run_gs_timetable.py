@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import multiprocessing
 import os
 import sys
 import traceback
@@ -74,4 +75,6 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    # PyInstaller 실행 파일에서 업로드 파싱용 작업 프로세스가 다시 앱을 띄우지 않도록 한다.
+    multiprocessing.freeze_support()
     main()